@@ -3,16 +3,24 @@
 负责账户配置、多账户协调和会话缓存管理
 """
 import asyncio
-import json
+import functools
 import logging
 import os
+import random
+import stat
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
 
 from fastapi import HTTPException
 
+from util import fast_json
+
 if TYPE_CHECKING:
     from core.jwt import JWTManager
 
@@ -24,8 +32,36 @@ if os.path.exists("/data"):
 else:
     ACCOUNTS_FILE = "data/accounts.json"  # 本地存储（统一到 data 目录）
 
+# 账户过期时间统一按北京时间解析
+_BEIJING_TZ = timezone(timedelta(hours=8))
+
+# 无可用账户时复用同一个异常实例（故障期间每个请求都会触发）
+_NO_ACCOUNTS_EXC = HTTPException(503, "No available accounts")
+
+
+@functools.lru_cache(maxsize=256)
+def _account_http_exception(status_code: int, detail: str) -> HTTPException:
+    """按 (状态码, 详情) 缓存账户相关的 HTTPException 实例"""
+    return HTTPException(status_code, detail)
+
+
+def _parse_expires_at(value: str) -> Optional[datetime]:
+    """解析过期时间（格式: "2025-12-23 10:59:21"，按北京时间），失败返回 None"""
+    try:
+        # 标准格式直接按位置切片解析，避免 strptime 的开销
+        if len(value) == 19 and value[4] == "-" and value[7] == "-" and value[10] == " " and value[13] == ":" and value[16] == ":":
+            return datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                tzinfo=_BEIJING_TZ
+            )
+        # 非补零等不规范写法交给 strptime 处理
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=_BEIJING_TZ)
+    except (TypeError, ValueError):
+        return None
 
-@dataclass
+
+@dataclass(slots=True)
 class AccountConfig:
     """单个账户配置"""
     account_id: str
@@ -35,32 +71,24 @@ class AccountConfig:
     config_id: str
     expires_at: Optional[str] = None  # 账户过期时间 (格式: "2025-12-23 10:59:21")
     disabled: bool = False  # 手动禁用状态
+    # 解析后的过期时间（初始化时解析一次，避免每次路由都调用 strptime）
+    _expire_dt: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.expires_at:
+            self._expire_dt = _parse_expires_at(self.expires_at)
 
     def get_remaining_hours(self) -> Optional[float]:
         """计算账户剩余小时数"""
-        if not self.expires_at:
-            return None
-        try:
-            # 解析过期时间（假设为北京时间）
-            beijing_tz = timezone(timedelta(hours=8))
-            expire_time = datetime.strptime(self.expires_at, "%Y-%m-%d %H:%M:%S")
-            expire_time = expire_time.replace(tzinfo=beijing_tz)
-
-            # 当前时间（北京时间）
-            now = datetime.now(beijing_tz)
-
-            # 计算剩余时间
-            remaining = (expire_time - now).total_seconds() / 3600
-            return remaining
-        except Exception:
+        if self._expire_dt is None:
             return None
+        return (self._expire_dt - datetime.now(_BEIJING_TZ)).total_seconds() / 3600
 
     def is_expired(self) -> bool:
         """检查账户是否已过期"""
-        remaining = self.get_remaining_hours()
-        if remaining is None:
+        if self._expire_dt is None:
             return False  # 未设置过期时间，默认不过期
-        return remaining <= 0
+        return self._expire_dt <= datetime.now(_BEIJING_TZ)
 
 
 def format_account_expiration(remaining_hours: Optional[float]) -> tuple:
@@ -86,6 +114,13 @@ def format_account_expiration(remaining_hours: Optional[float]) -> tuple:
 
 class AccountManager:
     """单个账户管理器"""
+    __slots__ = (
+        "config", "http_client", "user_agent", "account_failure_threshold",
+        "rate_limit_cooldown_seconds", "jwt_manager", "on_state_change",
+        "_is_available", "last_error_time", "_last_429_time", "error_count",
+        "conversation_count",
+    )
+
     def __init__(self, config: AccountConfig, http_client, user_agent: str, account_failure_threshold: int, rate_limit_cooldown_seconds: int):
         self.config = config
         self.http_client = http_client
@@ -93,12 +128,36 @@ class AccountManager:
         self.account_failure_threshold = account_failure_threshold
         self.rate_limit_cooldown_seconds = rate_limit_cooldown_seconds
         self.jwt_manager: Optional['JWTManager'] = None  # 延迟初始化
-        self.is_available = True
+        # 可用状态变化回调（由 MultiAccountManager 注册，用于维护可用账户列表）
+        self.on_state_change: Optional[Callable[[str], None]] = None
+        self._is_available = True
         self.last_error_time = 0.0
-        self.last_429_time = 0.0  # 429错误专属时间戳
+        self._last_429_time = 0.0  # 429错误专属时间戳
+        # 注：错误/429 时间戳与会话缓存的 updated_at 均使用 time.monotonic()，不受系统时钟调整影响
         self.error_count = 0
         self.conversation_count = 0  # 累计对话次数
 
+    @property
+    def is_available(self) -> bool:
+        return self._is_available
+
+    @is_available.setter
+    def is_available(self, value: bool):
+        changed = value != self._is_available
+        self._is_available = value
+        if changed and self.on_state_change is not None:
+            self.on_state_change(self.config.account_id)
+
+    @property
+    def last_429_time(self) -> float:
+        return self._last_429_time
+
+    @last_429_time.setter
+    def last_429_time(self, value: float):
+        self._last_429_time = value
+        if self.on_state_change is not None:
+            self.on_state_change(self.config.account_id)
+
     async def get_jwt(self, request_id: str = "") -> str:
         """获取 JWT token (带错误处理)"""
         # 检查账户是否过期
@@ -117,7 +176,7 @@ class AccountManager:
             self.error_count = 0
             return jwt
         except Exception as e:
-            self.last_error_time = time.time()
+            self.last_error_time = time.monotonic()
             self.error_count += 1
             # 使用配置的失败阈值
             if self.error_count >= self.account_failure_threshold:
@@ -133,7 +192,7 @@ class AccountManager:
         if self.is_available:
             return True
 
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # 检查429冷却期（10分钟后自动恢复）
         if self.last_429_time > 0:
@@ -153,7 +212,7 @@ class AccountManager:
             - cooldown_seconds: 剩余冷却秒数，0表示无冷却，-1表示永久禁用
             - cooldown_reason: 冷却原因，None表示无冷却
         """
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # 优先检查429冷却期（无论账户是否可用）
         if self.last_429_time > 0:
@@ -170,92 +229,144 @@ class AccountManager:
         return (-1, "错误禁用")
 
 
+# 会话缓存分片数（必须为2的幂，便于用位运算取模）
+SESSION_CACHE_SHARDS = 16
+
+
 class MultiAccountManager:
     """多账户协调器"""
     def __init__(self, session_cache_ttl_seconds: int):
         self.accounts: Dict[str, AccountManager] = {}
-        self.account_list: List[str] = []  # 账户ID列表 (用于轮询)
+        self.account_list: List[str] = []  # 账户ID列表 (保持配置顺序)
+        # 当前可用账户ID列表（仅在账户状态变化时增量维护，避免每次请求全量扫描）
+        self._available: List[str] = []
+        self.account_selection_samples = 4  # 选择账户时随机采样的候选数
         self.current_index = 0
-        self._cache_lock = asyncio.Lock()  # 缓存操作专用锁
-        self._index_lock = asyncio.Lock()  # 索引更新专用锁
-        # 全局会话缓存：{conv_key: {"account_id": str, "session_id": str, "updated_at": float}}
-        self.global_session_cache: Dict[str, dict] = {}
-        self.cache_max_size = 1000  # 最大缓存条目数
+        # 全局会话缓存（按 conv_key 哈希分片，分片内按访问顺序排列，最旧的在最前）
+        # 每个分片：{conv_key: {"account_id": str, "session_id": str, "updated_at": float}}
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(SESSION_CACHE_SHARDS)]
+        # 分片锁只用于清理/裁剪扫描，普通读写直接操作字典
+        self._shard_locks: List[asyncio.Lock] = [asyncio.Lock() for _ in range(SESSION_CACHE_SHARDS)]
+        # 已调度的裁剪任务 {分片下标: 任务}（持有任务引用，避免未完成的任务被垃圾回收）
+        self._trim_tasks: Dict[int, asyncio.Task] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None  # 后台清理任务
+        self.cache_max_size = 1000  # 最大缓存条目数（所有分片合计）
+        self._shard_trim_threshold = int(self._shard_max_size() * 1.2)  # 写入时触发立即裁剪的分片大小
         self.cache_ttl = session_cache_ttl_seconds  # 缓存过期时间（秒）
         # Session级别锁：防止同一对话的并发请求冲突
-        self._session_locks: Dict[str, asyncio.Lock] = {}
-        self._session_locks_lock = asyncio.Lock()  # 保护锁字典的锁
-        self._session_locks_max_size = 2000  # 最大锁数量
-
-    def _clean_expired_cache(self):
-        """清理过期的缓存条目"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, value in self.global_session_cache.items()
-            if current_time - value["updated_at"] > self.cache_ttl
-        ]
-        for key in expired_keys:
-            del self.global_session_cache[key]
-        if expired_keys:
-            logger.info(f"[CACHE] 清理 {len(expired_keys)} 个过期会话缓存")
-
-    def _ensure_cache_size(self):
-        """确保缓存不超过最大大小（LRU策略）"""
-        if len(self.global_session_cache) > self.cache_max_size:
-            # 按更新时间排序，删除最旧的20%
-            sorted_items = sorted(
-                self.global_session_cache.items(),
-                key=lambda x: x[1]["updated_at"]
-            )
-            remove_count = len(sorted_items) - int(self.cache_max_size * 0.8)
-            for key, _ in sorted_items[:remove_count]:
-                del self.global_session_cache[key]
-            logger.info(f"[CACHE] LRU清理 {remove_count} 个最旧会话缓存")
+        # 弱引用字典：正在使用的锁由调用方持有引用，无人使用的锁自动回收
+        self._session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def _shard(self, conv_key: str) -> int:
+        """计算 conv_key 所属的分片下标"""
+        return hash(conv_key) & (SESSION_CACHE_SHARDS - 1)
+
+    def get_session_cache(self, conv_key: str) -> Optional[dict]:
+        """读取会话缓存（无锁读取）"""
+        return self._shards[self._shard(conv_key)].get(conv_key)
+
+    def _clean_expired_cache(self, shard: OrderedDict) -> int:
+        """清理单个分片中过期的缓存条目，返回清理数量
+
+        分片按访问顺序排列，从头部开始弹出，遇到第一个未过期条目即可停止
+        """
+        current_time = time.monotonic()
+        removed = 0
+        while shard:
+            key = next(iter(shard))
+            if current_time - shard[key]["updated_at"] <= self.cache_ttl:
+                break
+            del shard[key]
+            removed += 1
+        return removed
+
+    def _shard_max_size(self) -> int:
+        """单个分片的最大条目数"""
+        return max(1, self.cache_max_size // SESSION_CACHE_SHARDS)
+
+    def _ensure_cache_size(self, shard: OrderedDict):
+        """确保单个分片不超过其最大大小（LRU策略，淘汰最久未访问的条目）"""
+        shard_max_size = self._shard_max_size()
+        if len(shard) <= shard_max_size:
+            return
+        remove_count = len(shard) - int(shard_max_size * 0.8)
+        for _ in range(remove_count):
+            shard.popitem(last=False)
+        logger.info(f"[CACHE] LRU清理 {remove_count} 个最旧会话缓存")
+
+    def _cleanup_interval(self) -> int:
+        """后台清理间隔：TTL 的 1/4，限制在 30 秒到 5 分钟之间"""
+        return max(30, min(self.cache_ttl // 4, 300))
 
     async def start_background_cleanup(self):
-        """启动后台缓存清理任务（每5分钟执行一次）"""
+        """启动后台缓存清理任务（间隔随缓存 TTL 自适应，最长5分钟）"""
+        self._cleanup_task = asyncio.current_task()
         try:
             while True:
-                await asyncio.sleep(300)  # 5分钟
-                async with self._cache_lock:
-                    self._clean_expired_cache()
-                    self._ensure_cache_size()
+                # 每轮重新计算，TTL 可在系统设置中热更新
+                await asyncio.sleep(self._cleanup_interval())
+                expired_count = 0
+                # 逐个分片清理，只持有当前分片的锁，不阻塞其他分片的写入
+                for index, lock in enumerate(self._shard_locks):
+                    if not self._shards[index]:
+                        continue  # 空分片无需加锁扫描
+                    async with lock:
+                        shard = self._shards[index]
+                        expired_count += self._clean_expired_cache(shard)
+                        self._ensure_cache_size(shard)
+                if expired_count:
+                    logger.info(f"[CACHE] 清理 {expired_count} 个过期会话缓存")
+                # 429冷却结束、账户过期等基于时间的状态变化在此统一刷新
+                self._refresh_availability()
         except asyncio.CancelledError:
             logger.info("[CACHE] 后台清理任务已停止")
         except Exception as e:
             logger.error(f"[CACHE] 后台清理任务异常: {e}")
 
-    async def set_session_cache(self, conv_key: str, account_id: str, session_id: str):
-        """线程安全地设置会话缓存"""
-        async with self._cache_lock:
-            self.global_session_cache[conv_key] = {
-                "account_id": account_id,
-                "session_id": session_id,
-                "updated_at": time.time()
-            }
-            # 检查缓存大小
-            self._ensure_cache_size()
-
-    async def update_session_time(self, conv_key: str):
-        """线程安全地更新会话时间戳"""
-        async with self._cache_lock:
-            if conv_key in self.global_session_cache:
-                self.global_session_cache[conv_key]["updated_at"] = time.time()
-
-    async def acquire_session_lock(self, conv_key: str) -> asyncio.Lock:
-        """获取指定对话的锁（用于防止同一对话的并发请求冲突）"""
-        async with self._session_locks_lock:
-            # 清理过多的锁（LRU策略：删除不在缓存中的锁）
-            if len(self._session_locks) > self._session_locks_max_size:
-                # 只保留当前缓存中存在的锁
-                valid_keys = set(self.global_session_cache.keys())
-                keys_to_remove = [k for k in self._session_locks if k not in valid_keys]
-                for k in keys_to_remove[:len(keys_to_remove)//2]:  # 删除一半无效锁
-                    del self._session_locks[k]
-
-            if conv_key not in self._session_locks:
-                self._session_locks[conv_key] = asyncio.Lock()
-            return self._session_locks[conv_key]
+    def set_session_cache(self, conv_key: str, account_id: str, session_id: str):
+        """设置会话缓存
+
+        单次字典赋值在事件循环中是原子的，写入无需加锁；
+        分片超出上限时再调度后台任务加锁裁剪
+        """
+        index = self._shard(conv_key)
+        shard = self._shards[index]
+        shard[conv_key] = {
+            "account_id": account_id,
+            "session_id": session_id,
+            "updated_at": time.monotonic()
+        }
+        shard.move_to_end(conv_key)
+        # 常规裁剪由后台清理任务完成，只有超出上限20%时才立即调度裁剪
+        if len(shard) > self._shard_trim_threshold and index not in self._trim_tasks:
+            self._trim_tasks[index] = asyncio.create_task(self._trim_shard(index))
+
+    def update_session_time(self, conv_key: str):
+        """更新会话时间戳并标记为最近使用"""
+        shard = self._shards[self._shard(conv_key)]
+        entry = shard.get(conv_key)
+        if entry is not None:
+            entry["updated_at"] = time.monotonic()
+            shard.move_to_end(conv_key)
+
+    async def _trim_shard(self, index: int):
+        """后台裁剪指定分片（持有分片锁，与定期清理互斥）"""
+        try:
+            async with self._shard_locks[index]:
+                self._ensure_cache_size(self._shards[index])
+        finally:
+            self._trim_tasks.pop(index, None)
+
+    def acquire_session_lock(self, conv_key: str) -> asyncio.Lock:
+        """获取指定对话的锁（用于防止同一对话的并发请求冲突）
+
+        调用方需在使用期间持有返回的锁对象，否则锁可能被回收
+        """
+        lock = self._session_locks.get(conv_key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[conv_key] = lock
+        return lock
 
     def update_http_client(self, http_client):
         """更新所有账户使用的 http_client（用于代理变更后重建客户端）"""
@@ -264,6 +375,29 @@ class MultiAccountManager:
             if account_mgr.jwt_manager is not None:
                 account_mgr.jwt_manager.http_client = http_client
 
+    def _is_account_eligible(self, account_id: str) -> bool:
+        """判断账户当前是否可被选择"""
+        account = self.accounts[account_id]
+        return (
+            account.should_retry()
+            and not account.config.is_expired()
+            and not account.config.disabled
+        )
+
+    def _recompute_availability(self, account_id: str):
+        """重新计算单个账户的可用性，并同步到可用账户列表"""
+        if account_id not in self.accounts:
+            return
+        eligible = self._is_account_eligible(account_id)
+        if eligible and account_id not in self._available:
+            self._available.append(account_id)
+        elif not eligible and account_id in self._available:
+            self._available.remove(account_id)
+
+    def _refresh_availability(self):
+        """全量重建可用账户列表"""
+        self._available = [acc_id for acc_id in self.account_list if self._is_account_eligible(acc_id)]
+
     def add_account(self, config: AccountConfig, http_client, user_agent: str, account_failure_threshold: int, rate_limit_cooldown_seconds: int, global_stats: dict):
         """添加账户"""
         manager = AccountManager(config, http_client, user_agent, account_failure_threshold, rate_limit_cooldown_seconds)
@@ -272,61 +406,146 @@ class MultiAccountManager:
             manager.conversation_count = global_stats["account_conversations"].get(config.account_id, 0)
         self.accounts[config.account_id] = manager
         self.account_list.append(config.account_id)
+        manager.on_state_change = self._recompute_availability
+        self._recompute_availability(config.account_id)
         logger.info(f"[MULTI] [ACCOUNT] 添加账户: {config.account_id}")
 
     async def get_account(self, account_id: Optional[str] = None, request_id: str = "") -> AccountManager:
-        """获取账户 (轮询或指定) - 优化锁粒度，减少竞争"""
+        """获取账户 (采样选择或指定)"""
         req_tag = f"[req_{request_id}] " if request_id else ""
 
         # 如果指定了账户ID（无需锁）
         if account_id:
             if account_id not in self.accounts:
-                raise HTTPException(404, f"Account {account_id} not found")
+                # 复用异常实例时清除旧的 traceback，避免 traceback 链不断增长
+                raise _account_http_exception(404, f"Account {account_id} not found").with_traceback(None)
             account = self.accounts[account_id]
             if not account.should_retry():
-                raise HTTPException(503, f"Account {account_id} temporarily unavailable")
+                raise _account_http_exception(503, f"Account {account_id} temporarily unavailable").with_traceback(None)
             return account
 
-        # 轮询选择可用账户（无锁读取账户列表）
-        available_accounts = [
-            acc_id for acc_id in self.account_list
-            if self.accounts[acc_id].should_retry()
-            and not self.accounts[acc_id].config.is_expired()
-            and not self.accounts[acc_id].config.disabled
-        ]
-
-        if not available_accounts:
-            raise HTTPException(503, "No available accounts")
-
-        # 只在更新索引时加锁（最小化锁持有时间）
-        async with self._index_lock:
-            if not hasattr(self, '_available_index'):
-                self._available_index = 0
+        # 可用列表为空时全量刷新一次（可能有账户刚结束429冷却）
+        if not self._available:
+            self._refresh_availability()
+
+        # 从可用账户中选择（可用列表由状态变化增量维护）
+        while True:
+            if not self._available:
+                raise _NO_ACCOUNTS_EXC.with_traceback(None)
+
+            # 随机采样K个候选，优先错误次数少、最近未出错的账户（power-of-K choices），
+            # 避免刚从429冷却恢复的账户被立即集中请求
+            candidates = random.sample(self._available, min(self.account_selection_samples, len(self._available)))
+            account_id = min(
+                candidates,
+                key=lambda acc_id: (self.accounts[acc_id].error_count, self.accounts[acc_id].last_error_time)
+            )
 
-            account_id = available_accounts[self._available_index % len(available_accounts)]
-            self._available_index = (self._available_index + 1) % len(available_accounts)
+            # 过期等基于时间的变化不会触发回调，选中后再校验一次
+            if self._is_account_eligible(account_id):
+                break
+            self._recompute_availability(account_id)
 
         account = self.accounts[account_id]
         logger.info(f"[MULTI] [ACCOUNT] {req_tag}选择账户: {account_id}")
         return account
 
+    def set_account_disabled(self, account_id: str, disabled: bool):
+        """原地更新账户的禁用状态（保留运行时状态和会话缓存）"""
+        self.accounts[account_id].config.disabled = disabled
+        self._recompute_availability(account_id)
+
+    def remove_account(self, account_id: str) -> int:
+        """原地移除账户，并清理绑定到该账户的会话缓存，返回清理的会话数"""
+        self.accounts.pop(account_id, None)
+        if account_id in self.account_list:
+            self.account_list.remove(account_id)
+        if account_id in self._available:
+            self._available.remove(account_id)
+        return self.drop_sessions_for_accounts({account_id})
+
+    def adopt_session_state(self, old_mgr: "MultiAccountManager", invalidated_ids: set) -> int:
+        """从旧的管理器接管会话缓存、会话锁和后台清理任务（用于重载配置）
+
+        仅清理绑定到 invalidated_ids 的会话，返回清理数量
+        """
+        self._shards = old_mgr._shards
+        self._session_locks = old_mgr._session_locks
+        dropped = self.drop_sessions_for_accounts(invalidated_ids) if invalidated_ids else 0
+        if old_mgr._cleanup_task is not None and not old_mgr._cleanup_task.done():
+            old_mgr._cleanup_task.cancel()
+            asyncio.create_task(self.start_background_cleanup())
+        return dropped
+
+    def drop_sessions_for_accounts(self, account_ids: set) -> int:
+        """清理绑定到指定账户的会话缓存，返回清理数量"""
+        removed = 0
+        for index, shard in enumerate(self._shards):
+            # 单次遍历重建分片（保持原有 LRU 顺序）；重建期间无 await，不会与写入交错
+            kept = OrderedDict((k, v) for k, v in shard.items() if v["account_id"] not in account_ids)
+            removed += len(shard) - len(kept)
+            self._shards[index] = kept
+        return removed
+
 
 # ---------- 配置文件管理 ----------
 
+# 串行化管理面板对账户文件的"读取-修改-写入"，避免并发操作相互覆盖
+_accounts_file_lock = asyncio.Lock()
+
+# 串行化所有线程（管理面板、注册、登录刷新服务）对账户文件的"读取-修改-写入"
+accounts_file_thread_lock = threading.Lock()
+
+
+def write_accounts_file(path, accounts_data: list):
+    """原子写入账户文件（唯一临时文件 + fsync + 原子替换，多个写入方互不覆盖临时文件）"""
+    content = fast_json.dumps_compact(accounts_data)
+    directory = os.path.dirname(path) or "."
+    try:
+        # mkstemp 创建的文件权限为 0600，替换前恢复为原文件权限（新文件为 0644）
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".accounts-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def save_accounts_to_file(accounts_data: list):
-    """保存账户配置到文件"""
-    with open(ACCOUNTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(accounts_data, f, ensure_ascii=False, indent=2)
+    """保存账户配置到文件（先写临时文件再原子替换，避免写入中断导致文件损坏）"""
+    write_accounts_file(ACCOUNTS_FILE, accounts_data)
     logger.info(f"[CONFIG] 配置已保存到 {ACCOUNTS_FILE}")
 
 
+def _save_accounts_locked(accounts_data: list):
+    """持有 accounts_file_thread_lock 保存账户配置，避免与注册/登录刷新服务的写入交错"""
+    with accounts_file_thread_lock:
+        save_accounts_to_file(accounts_data)
+
+
+async def save_accounts_to_file_async(accounts_data: list):
+    """在线程中保存账户配置，避免序列化和 fsync 阻塞事件循环"""
+    await asyncio.to_thread(_save_accounts_locked, accounts_data)
+
+
 def load_accounts_from_source() -> list:
     """从环境变量或文件加载账户配置，优先使用环境变量"""
     # 优先从环境变量加载
     env_accounts = os.environ.get('ACCOUNTS_CONFIG')
     if env_accounts:
         try:
-            accounts_data = json.loads(env_accounts)
+            accounts_data = fast_json.loads(env_accounts)
             if accounts_data:
                 logger.info(f"[CONFIG] 从环境变量加载配置，共 {len(accounts_data)} 个账户")
             else:
@@ -339,22 +558,26 @@ def load_accounts_from_source() -> list:
     if os.path.exists(ACCOUNTS_FILE):
         try:
             with open(ACCOUNTS_FILE, 'r', encoding='utf-8') as f:
-                accounts_data = json.load(f)
+                accounts_data = fast_json.loads(f.read())
             if accounts_data:
                 logger.info(f"[CONFIG] 从文件加载配置: {ACCOUNTS_FILE}，共 {len(accounts_data)} 个账户")
             else:
-                logger.warning(f"[CONFIG] 账户配置为空，请在管理面板添加账户或编辑 {ACCOUNTS_FILE}")
+                logger.warning(f"[CONFIG] 账户配置为空，请在管理面板添加账户或编辑 {ACCOUNTS_FILE}（JSON 数组，格式化或单行均可）")
             return accounts_data
         except Exception as e:
             logger.warning(f"[CONFIG] 文件加载失败: {str(e)}，创建空配置")
 
     # 文件不存在，创建空配置
     logger.warning(f"[CONFIG] 未找到 {ACCOUNTS_FILE}，已创建空配置文件")
-    logger.info(f"[CONFIG] 💡 请在管理面板添加账户，或直接编辑 {ACCOUNTS_FILE}，或使用批量上传功能，或设置环境变量 ACCOUNTS_CONFIG")
+    logger.info(f"[CONFIG] 💡 请在管理面板添加账户，或直接编辑 {ACCOUNTS_FILE}（JSON 数组，格式化或单行均可，程序保存时写为紧凑单行），或使用批量上传功能，或设置环境变量 ACCOUNTS_CONFIG")
     save_accounts_to_file([])
     return []
 
 
+# 账户配置必需字段
+_REQUIRED_FIELDS = frozenset({"secure_c_ses", "csesidx", "config_id"})
+
+
 def get_account_id(acc: dict, index: int) -> str:
     """获取账户ID（有显式ID则使用，否则生成默认ID）"""
     return acc.get("id", f"account_{index}")
@@ -375,10 +598,9 @@ def load_multi_account_config(
 
     for i, acc in enumerate(accounts_data, 1):
         # 验证必需字段
-        required_fields = ["secure_c_ses", "csesidx", "config_id"]
-        missing_fields = [f for f in required_fields if f not in acc]
+        missing_fields = _REQUIRED_FIELDS - acc.keys()
         if missing_fields:
-            raise ValueError(f"账户 {i} 缺少必需字段: {', '.join(missing_fields)}")
+            raise ValueError(f"账户 {i} 缺少必需字段: {', '.join(sorted(missing_fields))}")
 
         config = AccountConfig(
             account_id=get_account_id(acc, i),
@@ -403,6 +625,16 @@ def load_multi_account_config(
     return manager
 
 
+def _credentials_changed(old: AccountConfig, new: AccountConfig) -> bool:
+    """判断账户凭证是否变化（变化后旧的会话不可复用）"""
+    return (
+        old.secure_c_ses != new.secure_c_ses
+        or old.host_c_oses != new.host_c_oses
+        or old.csesidx != new.csesidx
+        or old.config_id != new.config_id
+    )
+
+
 def reload_accounts(
     multi_account_mgr: MultiAccountManager,
     http_client,
@@ -424,8 +656,6 @@ def reload_accounts(
             "conversation_count": account_mgr.conversation_count
         }
 
-    # 清空会话缓存并重新加载配置
-    multi_account_mgr.global_session_cache.clear()
     new_mgr = load_multi_account_config(
         http_client,
         user_agent,
@@ -446,11 +676,21 @@ def reload_accounts(
             account_mgr.conversation_count = state["conversation_count"]
             logger.debug(f"[CONFIG] 账户 {account_id} 运行时状态已恢复")
 
+    # 只清理已删除或凭证变化的账户的会话，其余会话绑定继续保留
+    invalidated_ids = set()
+    for account_id, old_account in multi_account_mgr.accounts.items():
+        new_account = new_mgr.accounts.get(account_id)
+        if new_account is None or _credentials_changed(old_account.config, new_account.config):
+            invalidated_ids.add(account_id)
+    dropped = new_mgr.adopt_session_state(multi_account_mgr, invalidated_ids)
+    if dropped:
+        logger.info(f"[CACHE] 重载配置清理 {dropped} 个失效会话缓存")
+
     logger.info(f"[CONFIG] 配置已重载，当前账户数: {len(new_mgr.accounts)}")
     return new_mgr
 
 
-def update_accounts_config(
+async def update_accounts_config(
     accounts_data: list,
     multi_account_mgr: MultiAccountManager,
     http_client,
@@ -461,7 +701,8 @@ def update_accounts_config(
     global_stats: dict
 ) -> MultiAccountManager:
     """更新账户配置（保存到文件并重新加载）"""
-    save_accounts_to_file(accounts_data)
+    async with _accounts_file_lock:
+        await save_accounts_to_file_async(accounts_data)
     return reload_accounts(
         multi_account_mgr,
         http_client,
@@ -473,7 +714,32 @@ def update_accounts_config(
     )
 
 
-def delete_account(
+def _delete_account_from_file(account_id: str) -> tuple:
+    """从账户文件中删除账户（在线程中执行，读取-修改-写入全程持有 accounts_file_thread_lock）
+
+    Returns:
+        (删除前的账户列表, 被删除账户的序号)
+    """
+    with accounts_file_thread_lock:
+        accounts_data = load_accounts_from_source()
+
+        # 过滤掉要删除的账户
+        removed_index = None
+        filtered = []
+        for i, acc in enumerate(accounts_data, 1):
+            if removed_index is None and get_account_id(acc, i) == account_id:
+                removed_index = i
+                continue
+            filtered.append(acc)
+
+        if removed_index is None:
+            raise ValueError(f"账户 {account_id} 不存在")
+
+        save_accounts_to_file(filtered)
+    return accounts_data, removed_index
+
+
+async def delete_account(
     account_id: str,
     multi_account_mgr: MultiAccountManager,
     http_client,
@@ -483,31 +749,51 @@ def delete_account(
     session_cache_ttl_seconds: int,
     global_stats: dict
 ) -> MultiAccountManager:
-    """删除单个账户"""
-    accounts_data = load_accounts_from_source()
+    """删除单个账户
 
-    # 过滤掉要删除的账户
-    filtered = [
-        acc for i, acc in enumerate(accounts_data, 1)
-        if get_account_id(acc, i) != account_id
-    ]
+    账户ID均为显式配置时原地移除，不重建账户管理器；
+    否则后续账户的默认ID（account_序号）会变化，需要完整重载
+    """
+    async with _accounts_file_lock:
+        accounts_data, removed_index = await asyncio.to_thread(_delete_account_from_file, account_id)
+
+    ids_shifted = any("id" not in acc for acc in accounts_data[removed_index:])
+    if ids_shifted or account_id not in multi_account_mgr.accounts:
+        return reload_accounts(
+            multi_account_mgr,
+            http_client,
+            user_agent,
+            account_failure_threshold,
+            rate_limit_cooldown_seconds,
+            session_cache_ttl_seconds,
+            global_stats
+        )
 
-    if len(filtered) == len(accounts_data):
-        raise ValueError(f"账户 {account_id} 不存在")
+    dropped = multi_account_mgr.remove_account(account_id)
+    logger.info(f"[CONFIG] 账户 {account_id} 已删除，清理 {dropped} 个关联会话，当前账户数: {len(multi_account_mgr.accounts)}")
+    return multi_account_mgr
 
-    save_accounts_to_file(filtered)
-    return reload_accounts(
-        multi_account_mgr,
-        http_client,
-        user_agent,
-        account_failure_threshold,
-        rate_limit_cooldown_seconds,
-        session_cache_ttl_seconds,
-        global_stats
-    )
 
+def _set_account_disabled_in_file(account_id: str, disabled: bool):
+    """更新账户文件中的禁用状态（在线程中执行，读取-修改-写入全程持有 accounts_file_thread_lock）"""
+    with accounts_file_thread_lock:
+        accounts_data = load_accounts_from_source()
+
+        # 查找并更新账户
+        found = False
+        for i, acc in enumerate(accounts_data, 1):
+            if get_account_id(acc, i) == account_id:
+                acc["disabled"] = disabled
+                found = True
+                break
 
-def update_account_disabled_status(
+        if not found:
+            raise ValueError(f"账户 {account_id} 不存在")
+
+        save_accounts_to_file(accounts_data)
+
+
+async def update_account_disabled_status(
     account_id: str,
     disabled: bool,
     multi_account_mgr: MultiAccountManager,
@@ -518,30 +804,23 @@ def update_account_disabled_status(
     session_cache_ttl_seconds: int,
     global_stats: dict
 ) -> MultiAccountManager:
-    """更新账户的禁用状态"""
-    accounts_data = load_accounts_from_source()
-
-    # 查找并更新账户
-    found = False
-    for i, acc in enumerate(accounts_data, 1):
-        if get_account_id(acc, i) == account_id:
-            acc["disabled"] = disabled
-            found = True
-            break
-
-    if not found:
-        raise ValueError(f"账户 {account_id} 不存在")
-
-    save_accounts_to_file(accounts_data)
-    new_mgr = reload_accounts(
-        multi_account_mgr,
-        http_client,
-        user_agent,
-        account_failure_threshold,
-        rate_limit_cooldown_seconds,
-        session_cache_ttl_seconds,
-        global_stats
-    )
+    """更新账户的禁用状态（已加载的账户原地更新，无需重载）"""
+    async with _accounts_file_lock:
+        await asyncio.to_thread(_set_account_disabled_in_file, account_id, disabled)
+    if account_id in multi_account_mgr.accounts:
+        multi_account_mgr.set_account_disabled(account_id, disabled)
+        new_mgr = multi_account_mgr
+    else:
+        # 账户尚未加载（例如文件被外部修改），回退到完整重载
+        new_mgr = reload_accounts(
+            multi_account_mgr,
+            http_client,
+            user_agent,
+            account_failure_threshold,
+            rate_limit_cooldown_seconds,
+            session_cache_ttl_seconds,
+            global_stats
+        )
 
     status_text = "已禁用" if disabled else "已启用"
     logger.info(f"[CONFIG] 账户 {account_id} {status_text}")
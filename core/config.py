@@ -11,21 +11,90 @@
 - 业务配置：环境变量 > YAML，支持热更新（API_KEY, PROXY, 重试策略等）
 """
 
+import asyncio
+import copy
 import os
+import re
 import yaml
 import secrets
 from pathlib import Path
-from typing import Optional, List
-from pydantic import BaseModel, Field, validator
+from functools import cached_property
+from typing import Awaitable, Callable, Optional, List
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
 
-# 加载 .env 文件
-load_dotenv()
+from util import fast_json
+from util.cron import CronSchedule, normalize_cron_expr, parse_cron_expression
+
+# 优先使用 libyaml 的 C 实现（未编译 libyaml 时回退到纯 Python 实现）
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+# watchdog 为可选依赖：安装后通过 inotify 等系统事件监听配置文件，否则回退到定时检查 mtime
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# 项目根目录（.env 默认放在这里）
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_dotenv_loaded = False
+
+
+def load_dotenv_once():
+    """加载 .env 文件（进程内只执行一次，首次创建 ConfigManager 时调用）
+
+    只检查当前工作目录和项目根目录，文件不存在时直接跳过（容器部署通常没有 .env）；
+    设置 DISABLE_DOTENV=1 可完全跳过
+    """
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    _dotenv_loaded = True
+    if os.environ.get("DISABLE_DOTENV") == "1":
+        return
+    for dotenv_path in (Path(".env"), _PROJECT_ROOT / ".env"):
+        if dotenv_path.is_file():
+            load_dotenv(dotenv_path)
+            return
+
+# 代理池环境变量分隔符（逗号/分号/换行符）
+_PROXY_SPLIT_RE = re.compile(r'[,;\n]')
+
+# 布尔型环境变量的真值（忽略大小写）
+_TRUTHY = frozenset({"1", "true", "yes", "y", "on"})
+
+# 基础配置中按 "YAML > 环境变量 > 默认值" 解析的字段：(字段名, 环境变量名, 默认值, 类型转换)
+_BASIC_FIELDS = (
+    ("api_key", "API_KEY", "", str),
+    ("base_url", "BASE_URL", "", str),
+    ("proxy", "PROXY", "", str),
+    ("google_mail", "GOOGLE_MAIL", "", str),
+    ("mail_api", "MAIL_API", "", str),
+    ("mail_admin_key", "MAIL_ADMIN_KEY", "", str),
+    ("register_number", "REGISTER_NUMBER", 5, int),
+    ("register_concurrency", "REGISTER_MAX_PARALLEL", 3, int),
+    # 代理池配置
+    ("proxy_strategy", "PROXY_STRATEGY", "random", str),
+    ("proxy_timeout", "PROXY_TIMEOUT", 10, int),
+    # 代理检查失败策略
+    ("proxy_check_fail_strategy", "PROXY_CHECK_FAIL_STRATEGY", "switch_then_direct", str),
+    ("proxy_check_retry_count", "PROXY_CHECK_RETRY_COUNT", 3, int),
+)
 
 
 # ==================== 配置模型定义 ====================
 
-class BasicConfig(BaseModel):
+class _FrozenConfig(BaseModel):
+    """配置模型基类：只读（热更新时整体替换，不修改已有实例）"""
+    model_config = ConfigDict(frozen=True)
+
+
+class BasicConfig(_FrozenConfig):
     """基础配置"""
     api_key: str = Field(default="", description="API访问密钥（留空则公开访问）")
     base_url: str = Field(default="", description="服务器URL（留空则自动检测）")
@@ -33,11 +102,12 @@ class BasicConfig(BaseModel):
     google_mail: str = Field(default="noreply-googlecloud@google.com", description="谷歌发件邮箱地址")
     mail_api: str = Field(default="", description="临时邮箱API地址")
     mail_admin_key: str = Field(default="", description="临时邮箱管理员密钥")
-    email_domain: list = Field(default=[], description="临时邮箱域名")
+    email_domain: list = Field(default_factory=list, description="临时邮箱域名")
     register_number: int = Field(default=5, ge=1, le=100, description="注册临时邮箱数量")
+    register_concurrency: int = Field(default=3, ge=1, le=10, description="同时注册的账户数")
 
     # ========== 代理池配置（老王特制，规避 IP 审查） ==========
-    proxy_pool: List[str] = Field(default=[], description="代理池列表（支持http/https/socks5）")
+    proxy_pool: List[str] = Field(default_factory=list, description="代理池列表（支持http/https/socks5）")
     proxy_strategy: str = Field(default="random", description="代理选择策略：random(随机), round_robin(轮询), failover(故障转移)")
     proxy_health_check: bool = Field(default=False, description="是否启用代理健康检查")
     proxy_timeout: int = Field(default=10, ge=3, le=60, description="代理连接超时（秒）")
@@ -47,7 +117,7 @@ class BasicConfig(BaseModel):
 
 
 
-class ImageGenerationConfig(BaseModel):
+class ImageGenerationConfig(_FrozenConfig):
     """图片生成配置"""
     enabled: bool = Field(default=True, description="是否启用图片生成")
     supported_models: List[str] = Field(
@@ -56,7 +126,7 @@ class ImageGenerationConfig(BaseModel):
     )
 
 
-class RetryConfig(BaseModel):
+class RetryConfig(_FrozenConfig):
     """重试策略配置"""
     max_new_session_tries: int = Field(default=5, ge=1, le=20, description="新会话尝试账户数")
     max_request_retries: int = Field(default=3, ge=1, le=10, description="请求失败重试次数")
@@ -71,31 +141,47 @@ class RetryConfig(BaseModel):
     verification_retry_interval_seconds: int = Field(default=5, ge=3, le=60, description="验证码重试时间间隔（秒）")
 
 
-class PublicDisplayConfig(BaseModel):
+class PublicDisplayConfig(_FrozenConfig):
     """公开展示配置"""
     logo_url: str = Field(default="", description="Logo URL")
     chat_url: str = Field(default="", description="开始对话链接")
 
 
-class SessionConfig(BaseModel):
+class SessionConfig(_FrozenConfig):
     """Session配置"""
     expire_hours: int = Field(default=24, ge=1, le=168, description="Session过期时间（小时）")
 
 
-class AutoRegisterConfig(BaseModel):
+class AutoRegisterConfig(_FrozenConfig):
     """自动注册配置"""
     enabled: bool = Field(default=False, description="是否启用自动注册")
     cron: str = Field(default="", description="Cron 表达式（5段）")
 
+    # 配置对象只读，每次热更新都会重建，因此派生值按对象缓存即可随配置写入自动失效
+    @cached_property
+    def normalized_cron(self) -> str:
+        """规范化后的 Cron 表达式"""
+        return normalize_cron_expr(self.cron)
+
+    @cached_property
+    def compiled_cron(self) -> Optional[CronSchedule]:
+        """解析后的 Cron 计划，表达式为空或无效时为 None"""
+        if not self.normalized_cron:
+            return None
+        try:
+            return parse_cron_expression(self.normalized_cron)
+        except ValueError:
+            return None
+
 
-class SecurityConfig(BaseModel):
+class SecurityConfig(_FrozenConfig):
     """安全配置（仅从环境变量读取，不可热更新）"""
     admin_key: str = Field(default="", description="管理员密钥（必需）")
     path_prefix: str = Field(default="", description="路径前缀（隐藏管理端点）")
     session_secret_key: str = Field(..., description="Session密钥")
     login_url: str = Field(default="https://auth.business.gemini.google/login?continueUrl=https:%2F%2Fbusiness.gemini.google%2F&wiffid=CAoSJDIwNTlhYzBjLTVlMmMtNGUxZS1hY2JkLThmOGY2ZDE0ODM1Mg", description="google business 登录链接")
 
-class AppConfig(BaseModel):
+class AppConfig(_FrozenConfig):
     """应用配置（统一管理）"""
     # 安全配置（仅从环境变量）
     security: SecurityConfig
@@ -114,6 +200,9 @@ class AppConfig(BaseModel):
 class ConfigManager:
     """配置管理器（单例）"""
 
+    # YAML 解析结果缓存：{路径: ((st_mtime_ns, st_size), 解析结果)}，文件未变化时跳过重新解析
+    _yaml_cache: dict = {}
+
     def __init__(self, yaml_path: str = None):
         # 自动检测环境并设置默认路径
         if yaml_path is None:
@@ -123,25 +212,45 @@ class ConfigManager:
                 yaml_path = "data/settings.yaml"  # 本地存储
         self.yaml_path = Path(yaml_path)
         self._config: Optional[AppConfig] = None
+        load_dotenv_once()
+        # 环境变量快照（进程运行期间基本不变，只在 reload() 时刷新）
+        self._env: dict = dict(os.environ)
+        # 上次通过 pydantic 校验的输入：(YAML 文件签名, 环境变量快照)
+        self._validated_inputs: Optional[tuple] = None
+        # 未设置 SESSION_SECRET_KEY 时使用的随机密钥（首次需要时生成，reload 后保持不变）
+        self._fallback_secret: Optional[str] = None
+        # 配置版本号：每次 load() 生成新配置时加 1，调用方可据此判断配置是否已重新加载
+        self.version = 0
         self.load()
 
-    def load(self):
+    def load(self, strict: bool = False):
         """
         加载配置
 
         优先级规则：
         1. 安全配置（ADMIN_KEY, PATH_PREFIX, SESSION_SECRET_KEY）：仅从环境变量读取
         2. 其他配置：YAML > 环境变量 > 默认值
+
+        Args:
+            strict: YAML 读取或解析失败时抛出异常（保留当前配置），而不是回退到默认配置
         """
+        env = self._env
+
+        # YAML 与环境变量都与上次校验时相同，直接复用已校验（已完成类型转换）的配置，跳过重新构建
+        if self._config is not None and self._validated_inputs is not None:
+            yaml_signature = self._yaml_signature()
+            if yaml_signature is not None and self._validated_inputs == (yaml_signature, env):
+                return
+
         # 1. 加载 YAML 配置
-        yaml_data = self._load_yaml()
+        yaml_data, yaml_signature = self._load_yaml(strict)
 
         # 2. 加载安全配置（仅从环境变量，不允许 Web 修改）
         security_config = SecurityConfig(
-            admin_key=os.getenv("ADMIN_KEY", ""),
-            path_prefix=os.getenv("PATH_PREFIX", ""),
-            session_secret_key=os.getenv("SESSION_SECRET_KEY", self._generate_secret()),
-            login_url=os.getenv("LOGIN_URL", ""),
+            admin_key=env.get("ADMIN_KEY", ""),
+            path_prefix=env.get("PATH_PREFIX", ""),
+            session_secret_key=env.get("SESSION_SECRET_KEY") or self._get_fallback_secret(),
+            login_url=env.get("LOGIN_URL", ""),
         )
 
         # 3. 加载基础配置（YAML > 环境变量 > 默认值）
@@ -150,14 +259,13 @@ class ConfigManager:
         # 处理 email_domain（支持多种格式）
         email_domain_value = basic_data.get("email_domain")
         if not email_domain_value:  # YAML 中不存在或为空
-            env_domains = os.getenv("EMAIL_DOMAIN", "")
+            env_domains = env.get("EMAIL_DOMAIN", "")
             if env_domains:
                 # 尝试解析 JSON 数组格式（如 ["domain1.com","domain2.org"]）
                 if env_domains.strip().startswith('['):
                     try:
-                        import json
-                        email_domain_value = json.loads(env_domains)
-                    except:
+                        email_domain_value = fast_json.loads(env_domains)
+                    except (ValueError, TypeError):
                         email_domain_value = []
                 else:
                     # 逗号分隔字符串格式（如 "domain1.com,domain2.org,domain3.net"）
@@ -168,42 +276,32 @@ class ConfigManager:
         # 处理 proxy_pool（支持多种格式）
         proxy_pool_value = basic_data.get("proxy_pool")
         if not proxy_pool_value:  # YAML 中不存在或为空
-            env_proxies = os.getenv("PROXY_POOL", "")
+            env_proxies = env.get("PROXY_POOL", "")
             if env_proxies:
                 # 尝试解析 JSON 数组格式
                 if env_proxies.strip().startswith('['):
                     try:
-                        import json
-                        proxy_pool_value = json.loads(env_proxies)
-                    except:
+                        proxy_pool_value = fast_json.loads(env_proxies)
+                    except (ValueError, TypeError):
                         proxy_pool_value = []
                 else:
                     # 逗号/分号/换行符分隔格式
-                    import re
                     proxy_pool_value = [
-                        p.strip() for p in re.split(r'[,;\n]', env_proxies)
+                        p.strip() for p in _PROXY_SPLIT_RE.split(env_proxies)
                         if p.strip()
                     ]
             else:
                 proxy_pool_value = []
 
+        basic_fields = {
+            name: basic_data.get(name) or cast(env.get(env_name, default))
+            for name, env_name, default, cast in _BASIC_FIELDS
+        }
         basic_config = BasicConfig(
-            api_key=basic_data.get("api_key") or os.getenv("API_KEY", ""),
-            base_url=basic_data.get("base_url") or os.getenv("BASE_URL", ""),
-            proxy=basic_data.get("proxy") or os.getenv("PROXY", ""),
-            google_mail=basic_data.get("google_mail") or os.getenv("GOOGLE_MAIL", ""),
-            mail_api=basic_data.get("mail_api") or os.getenv("MAIL_API", ""),
-            mail_admin_key=basic_data.get("mail_admin_key") or os.getenv("MAIL_ADMIN_KEY", ""),
+            **basic_fields,
             email_domain=email_domain_value,
-            register_number=basic_data.get("register_number") or int(os.getenv("REGISTER_NUMBER", 5)),
-            # 代理池配置
             proxy_pool=proxy_pool_value,
-            proxy_strategy=basic_data.get("proxy_strategy") or os.getenv("PROXY_STRATEGY", "random"),
-            proxy_health_check=basic_data.get("proxy_health_check", False) if "proxy_health_check" in basic_data else os.getenv("PROXY_HEALTH_CHECK", "").lower() in ["1", "true", "yes"],
-            proxy_timeout=basic_data.get("proxy_timeout") or int(os.getenv("PROXY_TIMEOUT", 10)),
-            # 代理检查失败策略
-            proxy_check_fail_strategy=basic_data.get("proxy_check_fail_strategy") or os.getenv("PROXY_CHECK_FAIL_STRATEGY", "switch_then_direct"),
-            proxy_check_retry_count=basic_data.get("proxy_check_retry_count") or int(os.getenv("PROXY_CHECK_RETRY_COUNT", 3))
+            proxy_health_check=basic_data.get("proxy_health_check", False) if "proxy_health_check" in basic_data else env.get("PROXY_HEALTH_CHECK", "").lower() in _TRUTHY,
         )
 
         # 4. 加载其他配置（从 YAML）
@@ -226,14 +324,14 @@ class ConfigManager:
         auto_register_data = yaml_data.get("auto_register", {})
         enabled_value = auto_register_data.get("enabled")
         if enabled_value is None:
-            enabled_value = os.getenv("AUTO_REGISTER_ENABLED", "").lower() in ["1", "true", "yes", "y", "on"]
+            enabled_value = env.get("AUTO_REGISTER_ENABLED", "").lower() in _TRUTHY
         auto_register_config = AutoRegisterConfig(
             enabled=enabled_value,
-            cron=auto_register_data.get("cron") or os.getenv("AUTO_REGISTER_CRON", "")
+            cron=auto_register_data.get("cron") or env.get("AUTO_REGISTER_CRON", "")
         )
 
-        # 5. 构建完整配置
-        self._config = AppConfig(
+        # 5. 构建完整配置（各分组已在上面完成校验，顶层直接组装，无需再走一遍校验）
+        self._config = AppConfig.model_construct(
             security=security_config,
             basic=basic_config,
             image_generation=image_generation_config,
@@ -242,30 +340,172 @@ class ConfigManager:
             session=session_config,
             auto_register=auto_register_config
         )
+        self._validated_inputs = (yaml_signature, env)
+        self.version += 1
 
-    def _load_yaml(self) -> dict:
-        """加载 YAML 文件"""
-        if self.yaml_path.exists():
-            try:
-                with open(self.yaml_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
-            except Exception as e:
-                print(f"[WARN] 加载配置文件失败: {e}，使用默认配置")
-        return {}
+    def _load_yaml(self, strict: bool = False) -> tuple:
+        """加载 YAML 文件（按 mtime/size 缓存解析结果）
+
+        Args:
+            strict: 文件缺失、为空或读取/解析失败时抛出异常，而不是返回空配置
+
+        Returns:
+            (配置字典, 文件签名) 元组；文件签名为 (st_mtime_ns, st_size)，
+            文件不存在时为 "missing"，读取失败时为 None
+        """
+        cache_key = str(self.yaml_path)
+        try:
+            st = os.stat(self.yaml_path)
+        except FileNotFoundError:
+            if strict:
+                raise
+            return {}, "missing"
+        except OSError as e:
+            if strict:
+                raise
+            print(f"[WARN] 加载配置文件失败: {e}，使用默认配置")
+            return {}, None
+
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._yaml_cache.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            # 返回副本，避免调用方修改缓存内容
+            return copy.deepcopy(cached[1]), signature
+
+        try:
+            with open(self.yaml_path, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=_YamlLoader)
+        except Exception as e:
+            if strict:
+                raise
+            print(f"[WARN] 加载配置文件失败: {e}，使用默认配置")
+            return {}, None
+        if data is None:
+            if strict:
+                # 文件为空（可能正在写入），不视为"清空全部配置"
+                raise ValueError("配置文件为空")
+            data = {}
+        self._yaml_cache[cache_key] = (signature, data)
+        return copy.deepcopy(data), signature
 
     def _generate_secret(self) -> str:
         """生成随机密钥"""
         return secrets.token_urlsafe(32)
 
+    def _get_fallback_secret(self) -> str:
+        """获取默认 Session 密钥（进程内只生成一次）"""
+        if self._fallback_secret is None:
+            self._fallback_secret = self._generate_secret()
+        return self._fallback_secret
+
     def save_yaml(self, data: dict):
         """保存 YAML 配置"""
         self.yaml_path.parent.mkdir(exist_ok=True)
         with open(self.yaml_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
+            yaml.dump(data, f, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        # mtime 精度不足时同一时刻的写入可能无法被识别，保存后直接失效缓存和校验记录
+        self._yaml_cache.pop(str(self.yaml_path), None)
+        self._validated_inputs = None
+
+    def _yaml_signature(self):
+        """YAML 文件签名 (st_mtime_ns, st_size)，文件不存在时为 "missing"，无法读取时为 None"""
+        try:
+            st = os.stat(self.yaml_path)
+        except FileNotFoundError:
+            return "missing"
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    async def watch(
+        self,
+        on_change: Optional[Callable[[], Awaitable[None]]] = None,
+        debounce_ms: int = 200,
+        poll_interval: float = 5.0,
+    ):
+        """
+        监听 YAML 配置文件变化并自动热更新
 
-    def reload(self):
-        """重新加载配置（热更新）"""
-        self.load()
+        采用前沿防抖：收到事件后立即重载，之后 debounce_ms 内的事件合并，
+        窗口结束时若期间还有事件再补一次重载（编辑器保存常产生连续多个事件）。
+        文件内容未变化（例如管理面板保存后已主动 reload）时不会重复重载。
+
+        Args:
+            on_change: 配置重载后调用的异步回调
+            debounce_ms: 防抖窗口（毫秒）
+            poll_interval: 未安装 watchdog 时检查 mtime 的间隔（秒）
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        observer = None
+
+        if Observer is not None:
+            yaml_path = str(self.yaml_path.resolve())
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    paths = (getattr(event, "src_path", None), getattr(event, "dest_path", None))
+                    if any(p and os.path.abspath(p) == yaml_path for p in paths):
+                        loop.call_soon_threadsafe(changed.set)
+
+            self.yaml_path.parent.mkdir(parents=True, exist_ok=True)
+            observer = Observer()
+            observer.schedule(_Handler(), str(self.yaml_path.parent.resolve()), recursive=False)
+            observer.daemon = True
+            observer.start()
+
+        # 以上次加载时的文件签名为基准，签名不变则跳过（重载失败也记录签名，避免反复重试）
+        last_signature = self._validated_inputs[0] if self._validated_inputs else None
+
+        async def apply():
+            nonlocal last_signature
+            signature = self._yaml_signature()
+            if signature is None or signature == last_signature:
+                return
+            if signature == "missing" or signature[1] == 0:
+                # 编辑器"删除后重建"保存或写入中途的中间状态，不记录签名，等文件写完后的事件再重载
+                return
+            last_signature = signature
+            if self._validated_inputs and self._validated_inputs[0] == signature:
+                return  # 已由其他途径（如管理面板保存）加载过
+            try:
+                # 严格模式：YAML 解析失败时抛出异常，不回退到默认配置（否则 API 密钥等设置会被清空）
+                self.reload(strict=True)
+            except Exception as e:
+                print(f"[WARN] 配置文件变化但重载失败: {e}，继续使用当前配置")
+                return
+            print(f"[CONFIG] 检测到 {self.yaml_path} 变化，配置已重新加载")
+            if on_change is not None:
+                try:
+                    await on_change()
+                except Exception as e:
+                    # 回调异常不能终止监听任务，否则之后的修改都不会再生效
+                    print(f"[WARN] 配置重载后应用失败: {e}")
+
+        try:
+            while True:
+                if observer is not None:
+                    await changed.wait()
+                else:
+                    await asyncio.sleep(poll_interval)
+                changed.clear()
+                await apply()  # 前沿：立即重载
+                await asyncio.sleep(debounce_ms / 1000)
+                if changed.is_set():  # 窗口内有新事件，补一次后沿重载
+                    changed.clear()
+                    await apply()
+        finally:
+            if observer is not None:
+                observer.stop()
+
+    def reload(self, strict: bool = False):
+        """重新加载配置（热更新）
+
+        Args:
+            strict: YAML 读取或解析失败时抛出异常并保留当前配置（文件监听使用）
+        """
+        self._env = dict(os.environ)
+        self.load(strict)
 
     @property
     def config(self) -> AppConfig:
@@ -274,146 +514,100 @@ class ConfigManager:
 
     # ==================== 便捷访问属性 ====================
 
-    @property
-    def api_key(self) -> str:
-        """API访问密钥"""
-        return self._config.basic.api_key
+    def __getattr__(self, name: str):
+        """便捷访问属性（如 config_manager.api_key），映射见 _SHORTCUT_FIELDS"""
+        path = _SHORTCUT_FIELDS.get(name)
+        if path is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        section, field = path
+        return getattr(getattr(self._config, section), field)
+
+
+# 便捷访问属性 -> (配置分组, 字段名)
+_SHORTCUT_FIELDS = {
+    "api_key": ("basic", "api_key"),                                      # API访问密钥
+    "admin_key": ("security", "admin_key"),                               # 管理员密钥
+    "path_prefix": ("security", "path_prefix"),                           # 路径前缀
+    "session_secret_key": ("security", "session_secret_key"),             # Session密钥
+    "proxy": ("basic", "proxy"),                                          # 代理地址
+    "base_url": ("basic", "base_url"),                                    # 服务器URL
+    "logo_url": ("public_display", "logo_url"),                           # Logo URL
+    "chat_url": ("public_display", "chat_url"),                           # 开始对话链接
+    "image_generation_enabled": ("image_generation", "enabled"),          # 是否启用图片生成
+    "image_generation_models": ("image_generation", "supported_models"),  # 支持图片生成的模型列表
+    "session_expire_hours": ("session", "expire_hours"),                  # Session过期时间（小时）
+    "max_new_session_tries": ("retry", "max_new_session_tries"),          # 新会话尝试账户数
+    "max_request_retries": ("retry", "max_request_retries"),              # 请求失败重试次数
+    "max_account_switch_tries": ("retry", "max_account_switch_tries"),    # 账户切换尝试次数
+    "account_failure_threshold": ("retry", "account_failure_threshold"),  # 账户失败阈值
+    "rate_limit_cooldown_seconds": ("retry", "rate_limit_cooldown_seconds"),  # 429冷却时间（秒）
+    "session_cache_ttl_seconds": ("retry", "session_cache_ttl_seconds"),  # 会话缓存时间（秒）
+    "verification_retry_enabled": ("retry", "verification_retry_enabled"),  # 是否启用验证码重试
+    "max_verification_retries": ("retry", "max_verification_retries"),    # 验证码重试次数
+    "verification_retry_interval_seconds": ("retry", "verification_retry_interval_seconds"),  # 验证码重试时间间隔（秒）
+}
 
-    @property
-    def admin_key(self) -> str:
-        """管理员密钥"""
-        return self._config.security.admin_key
-
-    @property
-    def path_prefix(self) -> str:
-        """路径前缀"""
-        return self._config.security.path_prefix
-
-    @property
-    def session_secret_key(self) -> str:
-        """Session密钥"""
-        return self._config.security.session_secret_key
-
-    @property
-    def proxy(self) -> str:
-        """代理地址"""
-        return self._config.basic.proxy
 
-    @property
-    def base_url(self) -> str:
-        """服务器URL"""
-        return self._config.basic.base_url
-
-    @property
-    def logo_url(self) -> str:
-        """Logo URL"""
-        return self._config.public_display.logo_url
-
-    @property
-    def chat_url(self) -> str:
-        """开始对话链接"""
-        return self._config.public_display.chat_url
-
-    @property
-    def image_generation_enabled(self) -> bool:
-        """是否启用图片生成"""
-        return self._config.image_generation.enabled
-
-    @property
-    def image_generation_models(self) -> List[str]:
-        """支持图片生成的模型列表"""
-        return self._config.image_generation.supported_models
-
-    @property
-    def session_expire_hours(self) -> int:
-        """Session过期时间（小时）"""
-        return self._config.session.expire_hours
-
-    @property
-    def max_new_session_tries(self) -> int:
-        """新会话尝试账户数"""
-        return self._config.retry.max_new_session_tries
-
-    @property
-    def max_request_retries(self) -> int:
-        """请求失败重试次数"""
-        return self._config.retry.max_request_retries
-
-    @property
-    def max_account_switch_tries(self) -> int:
-        """账户切换尝试次数"""
-        return self._config.retry.max_account_switch_tries
-
-    @property
-    def account_failure_threshold(self) -> int:
-        """账户失败阈值"""
-        return self._config.retry.account_failure_threshold
-
-    @property
-    def rate_limit_cooldown_seconds(self) -> int:
-        """429冷却时间（秒）"""
-        return self._config.retry.rate_limit_cooldown_seconds
-
-    @property
-    def session_cache_ttl_seconds(self) -> int:
-        """会话缓存时间（秒）"""
-        return self._config.retry.session_cache_ttl_seconds
+# ==================== 全局配置管理器 ====================
 
-    @property
-    def verification_retry_enabled(self) -> bool:
-        """是否启用验证码重试"""
-        return self._config.retry.verification_retry_enabled
+# 延迟创建：首次访问时才解析 YAML、构建配置模型，避免 import 阶段的开销
+_config_manager: Optional[ConfigManager] = None
 
-    @property
-    def max_verification_retries(self) -> int:
-        """验证码重试次数"""
-        return self._config.retry.max_verification_retries
 
-    @property
-    def verification_retry_interval_seconds(self) -> int:
-        """验证码重试时间间隔（秒）"""
-        return self._config.retry.verification_retry_interval_seconds
+def get_config_manager() -> ConfigManager:
+    """获取全局配置管理器（首次调用时创建）"""
+    global _config_manager
+    if _config_manager is None:
+        _config_manager = ConfigManager()
+    return _config_manager
 
 
-# ==================== 全局配置管理器 ====================
+def __getattr__(name: str):
+    # 兼容 `from core.config import config_manager`（PEP 562 模块级 __getattr__）
+    if name == "config_manager":
+        return get_config_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-config_manager = ConfigManager()
 
 # 注意：不要直接引用 config_manager.config，因为 reload() 后引用会失效
 # 应该始终通过 config_manager.config 访问配置
 def get_config() -> AppConfig:
     """获取当前配置（支持热更新）"""
-    return config_manager.config
+    return get_config_manager().config
 
 # 为了向后兼容，保留 config 变量，但使用属性访问
 class _ConfigProxy:
     """配置代理，确保始终访问最新配置"""
+    __slots__ = ()
+
+    # 直接读取管理器的 _config（load() 中整体替换，引用始终是最新配置），
+    # 避免每次访问都经过函数调用和 config 属性两层间接
     @property
     def basic(self):
-        return config_manager.config.basic
+        return (_config_manager or get_config_manager())._config.basic
 
     @property
     def security(self):
-        return config_manager.config.security
+        return (_config_manager or get_config_manager())._config.security
 
     @property
     def image_generation(self):
-        return config_manager.config.image_generation
+        return (_config_manager or get_config_manager())._config.image_generation
 
     @property
     def retry(self):
-        return config_manager.config.retry
+        return (_config_manager or get_config_manager())._config.retry
 
     @property
     def public_display(self):
-        return config_manager.config.public_display
+        return (_config_manager or get_config_manager())._config.public_display
 
     @property
     def session(self):
-        return config_manager.config.session
+        return (_config_manager or get_config_manager())._config.session
 
     @property
     def auto_register(self):
-        return config_manager.config.auto_register
+        return (_config_manager or get_config_manager())._config.auto_register
 
 config = _ConfigProxy()
@@ -14,10 +14,10 @@ from typing import Any, Dict, Optional
 
 from core.model_config import (
     get_base_model_name,
-    get_thinking_settings,
     is_search_model,
     parse_model_features,
 )
+from util.anti_truncation import remove_done_marker
 
 logger = logging.getLogger("gemini")
 
@@ -40,7 +40,7 @@ def build_assist_generation_config(
     """
     config = {}
 
-    # 1. 设置模型ID
+    # 设置模型ID
     if base_model_id:
         config["modelId"] = base_model_id
     else:
@@ -48,18 +48,7 @@ def build_assist_generation_config(
         if base_model:
             config["modelId"] = base_model
 
-    # 2. 获取思考配置
-    thinking_budget, include_thoughts = get_thinking_settings(model_name)
-
-    # 3. 如果有思考配置，添加到 config
-    # 注意：Business API 可能使用不同的字段名，这里预留接口
-    if thinking_budget is not None:
-        # Business API 的思考配置（字段名需要根据实际 API 确认）
-        config["thinkingConfig"] = {
-            "thinkingBudget": thinking_budget,
-            "includeThoughts": include_thoughts,
-        }
-        logger.debug(f"[GEMINI_FIX] 设置思考配置: budget={thinking_budget}, include={include_thoughts}")
+    # Business API 不支持 thinkingConfig，不再设置思考配置
 
     return config
 
@@ -103,11 +92,43 @@ def build_tools_spec(
 
 # ==================== 请求规范化 ====================
 
+def _build_stream_assist_fields(
+    base_model: str,
+    enable_image_generation: bool = False,
+    enable_video_generation: bool = False,
+) -> Dict[str, Any]:
+    """
+    一次性构建 streamAssistRequest 中的 assistGenerationConfig 和 toolsSpec
+
+    结果与 build_assist_generation_config + build_tools_spec 相同，
+    但直接使用已解析的基础模型名，避免重复解析模型名称（请求热路径使用）
+    """
+    fields = {}
+    if base_model:
+        fields["assistGenerationConfig"] = {"modelId": base_model}
+
+    # 默认启用搜索（根据原代码逻辑）
+    tools_spec = {
+        "toolRegistry": "default_tool_registry",
+        "webGroundingSpec": {},
+    }
+    # 图片/视频生成
+    if enable_image_generation:
+        tools_spec["imageGenerationSpec"] = {}
+    if enable_video_generation:
+        tools_spec["videoGenerationSpec"] = {}
+    fields["toolsSpec"] = tools_spec
+
+    return fields
+
+
 def normalize_business_api_request(
     body: Dict[str, Any],
     model_name: str,
     enable_image_generation: bool = False,
     enable_video_generation: bool = False,
+    *,
+    in_place: bool = False,
 ) -> Dict[str, Any]:
     """
     规范化 Business API 请求
@@ -117,41 +138,36 @@ def normalize_business_api_request(
         model_name: 完整模型名称
         enable_image_generation: 是否启用图片生成
         enable_video_generation: 是否启用视频生成
+        in_place: 是否直接修改 body（调用方不再使用原请求体时可避免复制）
 
     Returns:
         规范化后的请求体
     """
-    result = body.copy()
     features = parse_model_features(model_name)
 
-    # 确保 streamAssistRequest 存在
-    if "streamAssistRequest" not in result:
-        result["streamAssistRequest"] = {}
-
-    stream_request = result["streamAssistRequest"]
-
-    # 1. 设置 assistGenerationConfig
-    assist_config = build_assist_generation_config(
-        model_name,
-        base_model_id=features["base_model"],
-    )
-    if assist_config:
-        stream_request["assistGenerationConfig"] = assist_config
-
-    # 2. 设置 toolsSpec
-    tools_spec = build_tools_spec(
-        model_name,
+    # 设置 assistGenerationConfig 和 toolsSpec
+    stream_fields = _build_stream_assist_fields(
+        features.base_model,
         enable_image_generation=enable_image_generation,
         enable_video_generation=enable_video_generation,
     )
-    stream_request["toolsSpec"] = tools_spec
 
-    # 3. 记录日志
-    logger.debug(f"[GEMINI_FIX] 规范化请求 - 模型: {model_name} -> {features['base_model']}")
-    logger.debug(f"[GEMINI_FIX] 特性: fake_stream={features['is_fake_stream']}, "
-                f"anti_truncation={features['is_anti_truncation']}, "
-                f"thinking={features['thinking_mode']}, "
-                f"search={features['is_search']}")
+    if in_place:
+        result = body
+        result.setdefault("streamAssistRequest", {}).update(stream_fields)
+    else:
+        # 只构建新的外层字典和 streamAssistRequest，不修改调用方的原请求体
+        result = {
+            **body,
+            "streamAssistRequest": {**body.get("streamAssistRequest", {}), **stream_fields},
+        }
+
+    # 记录日志
+    # 使用 % 参数延迟格式化：未开启 DEBUG 时不构造日志字符串（每个请求都会调用）
+    logger.debug("[GEMINI_FIX] 规范化请求 - 模型: %s -> %s", model_name, features.base_model)
+    logger.debug("[GEMINI_FIX] 特性: fake_stream=%s, anti_truncation=%s, thinking=%s, search=%s",
+                 features.is_fake_stream, features.is_anti_truncation,
+                 features.thinking_mode, features.is_search)
 
     return result
 
@@ -174,10 +190,8 @@ def clean_response_text(text: str) -> str:
     if not text:
         return text
 
-    # 移除 [done] 标记
-    import re
-    pattern = re.compile(r"\s*\[done\]\s*", re.IGNORECASE)
-    cleaned = pattern.sub("", text)
+    # 移除 [done] 标记（与抗截断模块共用预编译的正则）
+    cleaned = remove_done_marker(text)
 
     return cleaned.strip()
 
@@ -5,7 +5,6 @@ Gemini Business 登录刷新服务
 艹，这个SB模块需要 Chrome 环境才能跑，别在没 Chrome 的容器里调用
 """
 import asyncio
-import json
 import os
 import time
 import logging
@@ -14,18 +13,41 @@ from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
-from dotenv import load_dotenv
-
+from core.account import accounts_file_thread_lock, write_accounts_file
+from core.config import get_config_manager, load_dotenv_once
+from util import fast_json
 from util.gemini_auth_utils import GeminiAuthConfig, GeminiAuthHelper, GeminiAuthFlow
 
-# 加载环境变量
-load_dotenv()
+# 加载环境变量（与 core.config 共用，只加载一次）
+load_dotenv_once()
 
 logger = logging.getLogger("gemini.login")
 
+# 登录刷新后需要写回 accounts.json 的凭证字段（expires_at 单独处理）
+_REFRESHED_FIELDS = ("csesidx", "config_id", "secure_c_ses", "host_c_oses")
+
+# 同时刷新的账户数（每个账户占用一个 Chrome 实例，受内存限制不宜过大）
+LOGIN_CONCURRENCY = 4
+
+# 北京时区（accounts.json 中的 expires_at 按北京时间记录）
+_BEIJING_TZ = timezone(timedelta(hours=8))
+
+
+@lru_cache(maxsize=1024)
+def _expires_at_timestamp(expires_at: str) -> Optional[float]:
+    """过期时间（格式: "2025-12-23 10:59:21"，北京时间）转为时间戳，解析失败返回 None
+
+    过期时间只在刷新后变化，缓存解析结果，轮询时不必每次都调用 strptime
+    """
+    try:
+        return datetime.strptime(expires_at, "%Y-%m-%d %H:%M:%S").replace(tzinfo=_BEIJING_TZ).timestamp()
+    except ValueError:
+        return None
+
 
 class LoginStatus(str, Enum):
     PENDING = "pending"
@@ -67,7 +89,7 @@ class LoginService:
     """登录刷新服务 - 管理账户刷新任务"""
 
     def __init__(self):
-        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._executor = ThreadPoolExecutor(max_workers=LOGIN_CONCURRENCY)
         self._tasks: Dict[str, LoginTask] = {}
         self._current_task_id: Optional[str] = None
         # 数据目录配置（与 main.py 保持一致）
@@ -75,70 +97,92 @@ class LoginService:
             self.output_dir = Path("/data")
         else:
             self.output_dir = Path("./data")
+        self.accounts_file = self.output_dir / "accounts.json"
         self._polling_task: Optional[asyncio.Task] = None
         self._is_polling = False
 
-        # 注意：不再在这里缓存 auth_config，改用 property 动态获取最新配置
+        # auth_config/auth_helper 按配置版本缓存：配置重新加载后自动重建，
         # 这样前端修改邮箱配置后热更新能立即生效
-        pass
+        self._auth_config: Optional[GeminiAuthConfig] = None
+        self._auth_helper: Optional[GeminiAuthHelper] = None
+        self._auth_config_version = -1
+
+    def _refresh_auth_objects(self):
+        """配置版本变化时重建认证配置和辅助工具"""
+        version = get_config_manager().version
+        if version != self._auth_config_version:
+            auth_config = GeminiAuthConfig()
+            self._auth_helper = GeminiAuthHelper(auth_config)
+            self._auth_config = auth_config
+            self._auth_config_version = version
 
     @property
     def auth_config(self) -> GeminiAuthConfig:
-        """每次访问时动态获取最新配置，支持热更新"""
-        return GeminiAuthConfig()
+        """获取最新配置（配置未变化时复用缓存实例），支持热更新"""
+        self._refresh_auth_objects()
+        return self._auth_config
 
     @property
     def auth_helper(self) -> GeminiAuthHelper:
-        """每次访问时动态获取最新配置，支持热更新"""
-        return GeminiAuthHelper(self.auth_config)
-
-    def _update_account_config(self, email: str, data: dict) -> Optional[dict]:
-        """更新账户配置到 accounts.json"""
-        accounts_file = self.output_dir / "accounts.json"
-
-        # 读取现有配置
-        accounts = []
-        if accounts_file.exists():
-            try:
-                with open(accounts_file, 'r') as f:
-                    accounts = json.load(f)
-            except:
-                accounts = []
-
-        # 查找并更新对应账户
-        updated = False
-        for account in accounts:
-            if account.get("id") == email:
-                account["csesidx"] = data["csesidx"]
-                account["config_id"] = data["config_id"]
-                account["secure_c_ses"] = data["secure_c_ses"]
-                account["host_c_oses"] = data["host_c_oses"]
-                account["expires_at"] = data.get("expires_at")
-                updated = True
-                break
+        """获取最新配置对应的辅助工具，支持热更新"""
+        self._refresh_auth_objects()
+        return self._auth_helper
+
+    def _save_refreshed_configs(self, results: List[Dict[str, Any]]) -> None:
+        """将本次任务中刷新成功的账户配置批量写回 accounts.json（整个任务只读写一次文件）"""
+        refreshed = {result["email"]: result for result in results if result["success"]}
+        if not refreshed:
+            return
 
-        if not updated:
-            logger.warning(f"[LOGIN] 账户 {email} 不存在于 accounts.json，跳过更新")
-            return None
+        # 与注册服务共用文件锁，避免并发的"读取-修改-写入"相互覆盖
+        with accounts_file_thread_lock:
+            self._save_refreshed_configs_locked(refreshed)
 
-        # 保存配置
-        with open(accounts_file, 'w') as f:
-            json.dump(accounts, f, indent=2, ensure_ascii=False)
+    def _save_refreshed_configs_locked(self, refreshed: Dict[str, Dict[str, Any]]) -> None:
+        """按账户 id 更新配置并写回（调用方需持有 accounts_file_thread_lock）"""
+        # 读取现有配置：文件缺失或损坏时不写入，避免用不完整的列表覆盖已有账户
+        try:
+            with open(self.accounts_file, 'rb') as f:
+                accounts = fast_json.loads(f.read())
+        except FileNotFoundError:
+            accounts = []
+        except ValueError as e:
+            logger.error(f"[LOGIN] accounts.json 解析失败，跳过写回: {e}")
+            for result in refreshed.values():
+                result["config"] = None
+            return
 
-        logger.info(f"✅ 配置已更新: {email}")
-        return data
+        # 按 id 建立索引（id 重复时以第一个为准），查找并更新对应账户
+        accounts_by_id = {account.get("id"): account for account in reversed(accounts)}
+        updated = 0
+        for email, result in refreshed.items():
+            account = accounts_by_id.get(email)
+            if account is None:
+                logger.warning(f"[LOGIN] 账户 {email} 不存在于 accounts.json，跳过更新")
+                result["config"] = None
+                continue
+
+            data = result["config"]
+            account.update({key: data[key] for key in _REFRESHED_FIELDS})
+            account["expires_at"] = data.get("expires_at")
+            updated += 1
+            logger.info(f"✅ 配置已更新: {email}")
 
-    def _login_one_sync(self, email: str) -> Dict[str, Any]:
+        if not updated:
+            return
+
+        # 保存配置（原子写入，避免写入中断导致文件损坏、账户全部丢失）
+        write_accounts_file(self.accounts_file, accounts)
+
+    def _login_one_sync(self, auth_flow: GeminiAuthFlow, email: str) -> Dict[str, Any]:
         """
         同步执行单次登录刷新 (在线程池中运行)
+        auth_flow 由整个任务共享（每个任务创建一次）
         返回: {"email": str, "success": bool, "config": dict|None, "error": str|None}
 
         艹，现在用统一的 GeminiAuthFlow 了，代码简洁多了！
         """
         try:
-            # 创建统一认证流程
-            auth_flow = GeminiAuthFlow(self.auth_config, self.auth_helper)
-
             # 从配置读取重试次数（艹，不能写死参数！）
             from core.config import config
             max_retries = config.retry.max_verification_retries if config.retry.verification_retry_enabled else 1
@@ -166,12 +210,9 @@ class LoginService:
                     "error": result.get("error")
                 }
 
-            # 更新配置
-            config_data = result["config"]
-            config = self._update_account_config(email, config_data)
-
+            # 配置在任务结束时由 _save_refreshed_configs 统一写回
             logger.info(f"✅ 登录刷新成功: {email}")
-            return {"email": email, "success": True, "config": config, "error": None}
+            return {"email": email, "success": True, "config": result["config"], "error": None}
 
         except Exception as e:
             logger.error(f"❌ 登录刷新异常 [{email}]: {e}")
@@ -181,7 +222,7 @@ class LoginService:
         """启动登录刷新任务"""
         if self._current_task_id:
             current_task = self._tasks.get(self._current_task_id)
-            if current_task and current_task.status == LoginStatus.RUNNING:
+            if current_task and current_task.status is LoginStatus.RUNNING:
                 raise ValueError("已有登录刷新任务在运行中")
 
         task = LoginTask(
@@ -199,22 +240,30 @@ class LoginService:
     async def _run_login_async(self, task: LoginTask):
         """异步执行登录刷新任务"""
         task.status = LoginStatus.RUNNING
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(LOGIN_CONCURRENCY)
+        # 统一认证流程每个任务创建一次，所有账户共用（配置在任务边界处热更新）
+        auth_flow = GeminiAuthFlow(self.auth_config, self.auth_helper)
+
+        async def run_one(account_id: str):
+            async with semaphore:
+                try:
+                    result = await loop.run_in_executor(self._executor, self._login_one_sync, auth_flow, account_id)
+                except Exception as e:
+                    result = {"email": account_id, "success": False, "config": None, "error": str(e)}
+            # progress 表示已完成的账户数（并发执行，完成顺序不固定）
+            task.progress += 1
+            task.results.append(result)
+            if result["success"]:
+                task.success_count += 1
+            else:
+                task.fail_count += 1
 
         try:
-            for i, account_id in enumerate(task.account_ids):
-                task.progress = i + 1
-                result = await loop.run_in_executor(self._executor, self._login_one_sync, account_id)
-                task.results.append(result)
-
-                if result["success"]:
-                    task.success_count += 1
-                else:
-                    task.fail_count += 1
-
-                # 每次刷新间隔
-                if i < len(task.account_ids) - 1:
-                    await asyncio.sleep(2)
+            # 浏览器流程主要在等待网络和页面，多个账户并发刷新
+            await asyncio.gather(*(run_one(account_id) for account_id in task.account_ids))
+            # 所有账户刷新完成后统一写回 accounts.json
+            await asyncio.to_thread(self._save_refreshed_configs, task.results)
 
             task.status = LoginStatus.SUCCESS if task.success_count > 0 else LoginStatus.FAILED
         except Exception as e:
@@ -236,42 +285,37 @@ class LoginService:
 
     def _get_expiring_accounts(self) -> List[str]:
         """获取1小时内即将过期的账户ID列表"""
-        accounts_file = self.output_dir / "accounts.json"
-
-        if not accounts_file.exists():
+        if not self.accounts_file.exists():
             return []
 
         try:
-            with open(accounts_file, 'r') as f:
-                accounts = json.load(f)
-        except:
+            with open(self.accounts_file, 'r', encoding='utf-8') as f:
+                accounts = fast_json.loads(f.read())
+        except (OSError, ValueError):
             return []
 
         expiring = []
-        beijing_tz = timezone(timedelta(hours=8))
-        now = datetime.now(beijing_tz)
+        now = time.time()
 
         for account in accounts:
             expires_at = account.get("expires_at")
-            if not expires_at:
+            if not expires_at or not isinstance(expires_at, str):
                 continue
 
-            try:
-                expire_time = datetime.strptime(expires_at, "%Y-%m-%d %H:%M:%S")
-                expire_time = expire_time.replace(tzinfo=beijing_tz)
-                remaining = (expire_time - now).total_seconds() / 3600
-
-                # 1小时内即将过期
-                if 0 < remaining <= 1:
-                    expiring.append(account.get("id"))
-            except:
+            expire_ts = _expires_at_timestamp(expires_at)
+            if expire_ts is None:
                 continue
 
+            # 1小时内即将过期
+            if 0 < expire_ts - now <= 3600:
+                expiring.append(account.get("id"))
+
         return expiring
 
     async def check_and_refresh(self):
         """检查并刷新即将过期的账户"""
-        expiring_accounts = self._get_expiring_accounts()
+        # 读取和解析 accounts.json 放到线程中执行，避免阻塞事件循环
+        expiring_accounts = await asyncio.to_thread(self._get_expiring_accounts)
 
         if not expiring_accounts:
             logger.debug("[LOGIN] 没有需要刷新的账户")
@@ -14,7 +14,10 @@
 因此 nothinking/maxthinking 功能不可用，已移除相关模型变体
 """
 
-from typing import List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 
 
 # ==================== 基础模型列表 ====================
@@ -27,11 +30,13 @@ BASE_MODELS = [
 ]
 
 # 功能前缀（只保留抗截断）
-FEATURE_PREFIXES = ["流式抗截断/"]
+ANTI_TRUNCATION_PREFIX = "流式抗截断/"
+FEATURE_PREFIXES = [ANTI_TRUNCATION_PREFIX]
 
 
 # ==================== 模型名称解析 ====================
 
+@lru_cache(maxsize=256)
 def get_base_model_name(model_name: str) -> str:
     """
     移除模型名称中的前缀，返回基础模型名
@@ -40,61 +45,54 @@ def get_base_model_name(model_name: str) -> str:
     - 流式抗截断/gemini-2.5-pro -> gemini-2.5-pro
     - gemini-2.5-pro -> gemini-2.5-pro
     """
-    result = model_name
+    # 移除前缀（目前只有抗截断一种前缀）
+    return model_name.removeprefix(ANTI_TRUNCATION_PREFIX)
 
-    # 移除前缀
-    for prefix in FEATURE_PREFIXES:
-        if result.startswith(prefix):
-            result = result[len(prefix):]
-            break
 
-    return result
+@dataclass(frozen=True, slots=True)
+class ModelFeatures:
+    """模型特性（由模型名称解析得到，只读）"""
+    base_model: str                   # 基础模型名
+    is_anti_truncation: bool = False  # 是否抗截断
+    # 以下特性 Business API 不支持，保留字段以保持接口兼容性
+    is_fake_stream: bool = False
+    is_search: bool = False
+    thinking_mode: str = ""
 
 
-def parse_model_features(model_name: str) -> dict:
+@lru_cache(maxsize=256)
+def parse_model_features(model_name: str) -> ModelFeatures:
     """
-    解析模型名称，提取特性
-
-    返回：
-    {
-        "base_model": str,           # 基础模型名
-        "is_anti_truncation": bool,  # 是否抗截断
-    }
+    解析模型名称，提取特性（结果会被缓存）
     """
-    features = {
-        "base_model": "",
-        "is_anti_truncation": False,
-    }
-
-    working_name = model_name
-
-    # 检测抗截断前缀
-    if working_name.startswith("流式抗截断/"):
-        features["is_anti_truncation"] = True
-        working_name = working_name[len("流式抗截断/"):]
-
-    # 获取基础模型名
-    features["base_model"] = working_name
-
-    return features
+    # 检测并移除抗截断前缀
+    base_model = model_name.removeprefix(ANTI_TRUNCATION_PREFIX)
+    return ModelFeatures(
+        base_model=base_model,
+        is_anti_truncation=len(base_model) != len(model_name),
+    )
 
 
 # ==================== 特性检测函数 ====================
 
 def is_anti_truncation_model(model_name: str) -> bool:
     """检查是否为抗截断模型"""
-    return model_name.startswith("流式抗截断/")
+    return model_name.startswith(ANTI_TRUNCATION_PREFIX)
 
 
 # ==================== 以下函数保留但不再使用（Business API 不支持） ====================
 
+# 思考配置固定值：(thinking_budget, include_thoughts)
+_NO_THINKING: Tuple[Optional[int], bool] = (None, True)
+
+
 def get_thinking_settings(model_name: str) -> Tuple[Optional[int], bool]:
     """
     获取思考配置（Business API 不支持，始终返回 None）
 
     保留此函数以保持接口兼容性
     """
-    return None, True
+    return _NO_THINKING
 
 
 def is_fake_streaming_model(model_name: str) -> bool:
@@ -109,7 +107,7 @@ def is_search_model(model_name: str) -> bool:
 
 # ==================== 模型列表生成 ====================
 
-def get_available_models() -> List[str]:
+def _build_available_models() -> Tuple[str, ...]:
     """
     生成模型列表（只包含基础模型和抗截断变体）
     """
@@ -119,22 +117,27 @@ def get_available_models() -> List[str]:
         # 基础模型
         models.append(base_model)
         # 流式抗截断模型
-        models.append(f"流式抗截断/{base_model}")
+        models.append(f"{ANTI_TRUNCATION_PREFIX}{base_model}")
 
-    return models
+    return tuple(models)
 
 
-def get_model_mapping() -> dict:
-    """
-    生成模型映射字典
-    """
-    mapping = {"gemini-auto": None}
+# 模型列表与映射只依赖上面的常量，导入时生成一次
+AVAILABLE_MODELS = _build_available_models()
+MODEL_MAPPING = MappingProxyType({
+    "gemini-auto": None,
+    **{model: get_base_model_name(model) for model in AVAILABLE_MODELS},
+})
+
+
+def get_available_models() -> Tuple[str, ...]:
+    """获取模型列表（只读）"""
+    return AVAILABLE_MODELS
 
-    for model in get_available_models():
-        base_model = get_base_model_name(model)
-        mapping[model] = base_model
 
-    return mapping
+def get_model_mapping() -> Mapping[str, Optional[str]]:
+    """获取模型映射字典（只读）"""
+    return MODEL_MAPPING
 
 
 # ==================== 测试 ====================
@@ -155,5 +158,5 @@ if __name__ == "__main__":
     for model in test_models:
         features = parse_model_features(model)
         print(f"  {model}")
-        print(f"    基础模型: {features['base_model']}")
-        print(f"    抗截断: {features['is_anti_truncation']}")
+        print(f"    基础模型: {features.base_model}")
+        print(f"    抗截断: {features.is_anti_truncation}")
@@ -5,141 +5,68 @@ Gemini Business 注册服务
 艹，这个SB模块需要 Chrome 环境才能跑，别在没 Chrome 的容器里调用
 """
 import asyncio
-import json
+import base64
 import os
+import secrets
+import threading
 import time
 import random
 import logging
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from string import ascii_letters, digits
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Deque
 
 import requests
-from dotenv import load_dotenv
-
-from core.config import config
-from util.gemini_auth_utils import GeminiAuthConfig, GeminiAuthHelper, GeminiAuthFlow
-
-# 加载环境变量
-load_dotenv()
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from core.account import accounts_file_thread_lock, write_accounts_file
+from core.config import config, get_config_manager, load_dotenv_once
+from util import fast_json
+from util.cron import cron_matches, next_cron_fire
+from util.gemini_auth_utils import (
+    GeminiAuthConfig,
+    GeminiAuthHelper,
+    GeminiAuthFlow,
+    ReusableDriverPool,
+    quit_reusable_drivers,
+)
+
+# 加载环境变量（与 core.config 共用，只加载一次）
+load_dotenv_once()
 
 logger = logging.getLogger("gemini.register")
 
-_CRON_MONTHS = {
-    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
-    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
-}
-_CRON_DAYS = {
-    "sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6
-}
-
-
-def _normalize_cron_expr(expr: str) -> str:
-    return " ".join(expr.strip().split())
-
-
-def _parse_cron_value(value: str, names: Optional[Dict[str, int]] = None) -> int:
-    if names:
-        name_value = names.get(value.lower())
-        if name_value is not None:
-            return name_value
-    return int(value)
-
-
-def _parse_cron_field(
-    field: str,
-    min_value: int,
-    max_value: int,
-    names: Optional[Dict[str, int]] = None,
-    allow_7_to_0: bool = False
-) -> set:
-    if field == "?":
-        field = "*"
-
-    values = set()
-    parts = field.split(",")
-    for part in parts:
-        part = part.strip()
-        if not part:
-            raise ValueError("Cron 字段为空")
-
-        step = 1
-        base = part
-        if "/" in part:
-            base, step_str = part.split("/", 1)
-            step = int(step_str)
-            if step <= 0:
-                raise ValueError("Cron 步长必须大于 0")
-
-        if base in ["*", "?"]:
-            start, end = min_value, max_value
-        elif "-" in base:
-            start_str, end_str = base.split("-", 1)
-            start = _parse_cron_value(start_str, names)
-            end = _parse_cron_value(end_str, names)
-        else:
-            start = end = _parse_cron_value(base, names)
-
-        if start > end:
-            raise ValueError("Cron 范围起止值错误")
-
-        for val in range(start, end + 1, step):
-            values.add(val)
-
-    if allow_7_to_0 and 7 in values:
-        values.remove(7)
-        values.add(0)
-
-    out_of_range = [v for v in values if v < min_value or v > max_value]
-    if out_of_range:
-        raise ValueError("Cron 字段超出有效范围")
-
-    return values
-
+def _memory_parallel_limit() -> Optional[int]:
+    """按物理内存估算可同时运行的 Chrome 数（每个约 2GB），无法获取时返回 None"""
+    try:
+        mem_gb = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 ** 3)
+    except (AttributeError, ValueError, OSError):
+        return None
+    return max(1, int(mem_gb // 2))
 
-def _parse_cron_expression(expr: str) -> Dict[str, Any]:
-    normalized = _normalize_cron_expr(expr)
-    parts = normalized.split(" ")
-    if len(parts) != 5:
-        raise ValueError("Cron 表达式需 5 段")
 
-    minute_field, hour_field, dom_field, month_field, dow_field = parts
+_MEMORY_PARALLEL_LIMIT = _memory_parallel_limit()
 
-    return {
-        "minute": _parse_cron_field(minute_field, 0, 59),
-        "hour": _parse_cron_field(hour_field, 0, 23),
-        "dom": _parse_cron_field(dom_field, 1, 31),
-        "month": _parse_cron_field(month_field, 1, 12, names=_CRON_MONTHS),
-        "dow": _parse_cron_field(dow_field, 0, 7, names=_CRON_DAYS, allow_7_to_0=True),
-        "dom_any": dom_field.strip() == "*",
-        "dow_any": dow_field.strip() == "*",
-    }
 
+def _register_max_parallel() -> int:
+    """同时注册的账户数（配置 register_concurrency / 环境变量 REGISTER_MAX_PARALLEL，默认 3），按物理内存限制上限"""
+    configured = min(10, max(1, config.basic.register_concurrency))
+    if _MEMORY_PARALLEL_LIMIT is None:
+        return configured
+    return min(configured, _MEMORY_PARALLEL_LIMIT)
 
-def _cron_matches(schedule: Dict[str, Any], now: datetime) -> bool:
-    if now.minute not in schedule["minute"]:
-        return False
-    if now.hour not in schedule["hour"]:
-        return False
-    if now.month not in schedule["month"]:
-        return False
+# 邮箱队列中最多预创建的数量（超出部分按需创建）
+_EMAIL_PREFETCH_LIMIT = 16
+# 同时预创建邮箱的数量（避免触发邮箱后台的限流）
+_EMAIL_PREFETCH_CONCURRENCY = 4
 
-    dom_match = now.day in schedule["dom"]
-    cron_dow = (now.weekday() + 1) % 7
-    dow_match = cron_dow in schedule["dow"]
-
-    if schedule["dom_any"] and schedule["dow_any"]:
-        return True
-    if schedule["dom_any"]:
-        return dow_match
-    if schedule["dow_any"]:
-        return dom_match
-    return dom_match or dow_match
+# Cron 轮询单次最长休眠时间（秒）：即使没有事件唤醒，也会定期按当前时间重新计算
+_CRON_MAX_SLEEP_SECONDS = 3600
 
 
 class RegisterStatus(str, Enum):
@@ -182,43 +109,70 @@ class RegisterService:
     """注册服务 - 管理注册任务（艹，整合后简洁多了）"""
 
     def __init__(self):
-        self._executor = ThreadPoolExecutor(max_workers=1)
+        # 最近一次写入的账户列表及写入后的文件状态：((st_mtime_ns, st_size), accounts)
+        self._accounts_cache: Optional[tuple] = None
         self._tasks: Dict[str, RegisterTask] = {}
         self._current_task_id: Optional[str] = None
-        self._email_queue: List[str] = []
+        self._email_queue: Deque[str] = deque()  # 预创建的邮箱（popleft 为 O(1) 且线程安全）
+        self._email_queue_key: Optional[tuple] = None  # 队列中邮箱对应的 (配置版本, 指定域名)
         self._cron_task: Optional[asyncio.Task] = None
         self._is_cron_polling = False
-        self._last_cron_run_key: Optional[str] = None
-        self._cron_cache_expr: Optional[str] = None
-        self._cron_cache: Optional[Dict[str, Any]] = None
-        self._stop_requested = False  # 停止标志
+        self._last_cron_run_key: Optional[int] = None  # 上次触发所在分钟（Unix 时间戳 // 60）
+        self._cron_cache_expr: Optional[str] = None  # 上次使用的表达式（用于变更/错误日志去重）
+        # Cron 轮询按下次触发时间休眠；配置变更或停止时通过该事件提前唤醒
+        self._cron_wakeup = asyncio.Event()
+        # 停止标志：注册线程内的认证流程在各阶段之间检查，可在单个账户注册中途退出
+        self._stop_event = threading.Event()
+        # 邮箱 API 复用连接（连接池 + 连接失败重试）；admin_key 支持热更新，每次请求单独传入
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
         # 数据目录配置（与 main.py 保持一致）
         if os.path.exists("/data"):
             self.output_dir = Path("/data")
         else:
             self.output_dir = Path("./data")
 
-        # 注意：不再在这里缓存 auth_config，改用 property 动态获取最新配置
+        # auth_config/auth_helper 按配置版本缓存：配置重新加载后自动重建，
         # 这样前端修改邮箱配置后热更新能立即生效
-        pass
+        self._auth_config: Optional[GeminiAuthConfig] = None
+        self._auth_helper: Optional[GeminiAuthHelper] = None
+        self._auth_config_version = -1
 
         # 指定的域名（用于批量注册时指定域名）
         self._specified_domain: Optional[str] = None
 
+    def _refresh_auth_objects(self):
+        """配置版本变化时重建认证配置和辅助工具"""
+        version = get_config_manager().version
+        if version != self._auth_config_version:
+            auth_config = GeminiAuthConfig()
+            self._auth_helper = GeminiAuthHelper(auth_config)
+            self._auth_config = auth_config
+            self._auth_config_version = version
+
     @property
     def auth_config(self) -> GeminiAuthConfig:
-        """每次访问时动态获取最新配置，支持热更新"""
-        return GeminiAuthConfig()
+        """获取最新配置（配置未变化时复用缓存实例），支持热更新"""
+        self._refresh_auth_objects()
+        return self._auth_config
 
     @property
     def auth_helper(self) -> GeminiAuthHelper:
-        """每次访问时动态获取最新配置，支持热更新"""
-        return GeminiAuthHelper(self.auth_config)
+        """获取最新配置对应的辅助工具，支持热更新"""
+        self._refresh_auth_objects()
+        return self._auth_helper
     
     @staticmethod
     def _random_str(n: int = 10) -> str:
-        """生成随机字符串（艹，用 sample 就行，choices 在某些环境会报错）"""
-        return "".join(random.sample(ascii_letters + digits, n))
+        """生成随机字符串（小写字母+数字，基于系统 CSPRNG，一次取够随机字节）"""
+        # Base32 每字节约 1.6 个字符，n 字节足够截取 n 位；字符集仅 a-z 和 2-7，邮箱名无需过滤
+        return base64.b32encode(secrets.token_bytes(n)).decode("ascii").lower()[:n]
     
     def _create_email(self, domain: Optional[str] = None) -> Optional[str]:
         """
@@ -245,7 +199,7 @@ class RegisterService:
                 "name": self._random_str(10),
                 "domain": domain
             }
-            r = requests.post(
+            r = self._http.post(
                 f"{self.auth_config.mail_api}/admin/new_address",
                 headers={"x-admin-auth": self.auth_config.admin_key},
                 json=json_data,
@@ -260,12 +214,78 @@ class RegisterService:
 
     def _get_email(self) -> Optional[str]:
         """获取邮箱（优先从队列取，否则创建新邮箱）"""
-        if self._email_queue:
-            return self._email_queue.pop(0)
-        return self._create_email(self._specified_domain)
-    
+        try:
+            # 多个注册线程可能同时取，直接 pop 并捕获队列为空
+            return self._email_queue.popleft()
+        except IndexError:
+            return self._create_email(self._specified_domain)
+
+    async def _prewarm_emails(self, count: int, executor: Optional[Executor] = None):
+        """
+        并发预创建邮箱放入队列，与注册任务同时运行以隐藏邮箱 API 延迟
+
+        队列中最多保留 _EMAIL_PREFETCH_LIMIT 个（含上一批次剩余），其余由 _get_email 按需创建，
+        避免大批量任务或中途停止时预先创建大量用不到的邮箱
+        """
+        count = min(count, _EMAIL_PREFETCH_LIMIT) - len(self._email_queue)
+        if count <= 0 or not self.auth_config.mail_api:
+            return
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(_EMAIL_PREFETCH_CONCURRENCY)
+
+        async def create_one() -> Optional[str]:
+            async with semaphore:
+                if self._stop_event.is_set():
+                    return None
+                email = await loop.run_in_executor(executor, self._create_email, self._specified_domain)
+            if email:
+                # 创建一个入队一个，注册线程可以立即取用
+                self._email_queue.append(email)
+            return email
+
+        try:
+            emails = await asyncio.gather(*(create_one() for _ in range(count)))
+        except Exception as e:
+            # 预创建失败不影响注册，_get_email 会按需创建
+            logger.warning(f"[REGISTER] 预创建邮箱失败: {e}")
+            return
+        created = sum(1 for email in emails if email)
+        logger.info(f"[REGISTER] 预创建邮箱 {created}/{count} 个")
+
     def _save_config(self, email: str, data: dict) -> Optional[dict]:
-        """保存账户配置到 accounts.json"""
+        """保存账户配置到 accounts.json（线程安全，与登录刷新服务共用文件锁）"""
+        with accounts_file_thread_lock:
+            return self._save_config_locked(email, data)
+
+    def _load_accounts(self, accounts_file: Path) -> list:
+        """
+        读取现有账户列表（调用方需持有 accounts_file_thread_lock）
+
+        文件状态（mtime/size）与上次写入一致时直接复用内存中的列表，批量注册时无需每个账户都重新解析；
+        文件不存在视为空列表；读取或解析错误直接抛出，避免用空列表覆盖已有账户
+        """
+        try:
+            st = accounts_file.stat()
+        except FileNotFoundError:
+            return []
+        if self._accounts_cache is not None and self._accounts_cache[0] == (st.st_mtime_ns, st.st_size):
+            return self._accounts_cache[1]
+
+        try:
+            with open(accounts_file, 'rb') as f:
+                accounts = fast_json.loads(f.read())
+        except FileNotFoundError:
+            return []
+        except ValueError as e:
+            # 内容损坏时不写入，避免只含新账户的列表覆盖已有账户（与登录刷新服务一致）
+            logger.error(f"[REGISTER] accounts.json 解析失败，跳过保存: {e}")
+            raise ValueError(f"accounts.json 解析失败，请修复后重试: {e}") from e
+        if not isinstance(accounts, list):
+            raise ValueError("accounts.json 格式错误：顶层必须是数组")
+        return accounts
+
+    def _save_config_locked(self, email: str, data: dict) -> Optional[dict]:
+        """保存账户配置到 accounts.json（调用方需持有 accounts_file_thread_lock）"""
         self.output_dir.mkdir(parents=True, exist_ok=True)
         accounts_file = self.output_dir / "accounts.json"
 
@@ -278,32 +298,28 @@ class RegisterService:
             "expires_at": data.get("expires_at")
         }
 
-        # 读取现有配置
-        accounts = []
-        if accounts_file.exists():
-            try:
-                with open(accounts_file, 'r') as f:
-                    accounts = json.load(f)
-            except:
-                accounts = []
+        # 追加新账户配置（生成新列表，写入失败时不污染缓存）
+        accounts = [*self._load_accounts(accounts_file), config]
 
-        # 追加新账户配置
-        accounts.append(config)
+        # 保存配置（原子写入，避免写入中断导致已有账户丢失）
+        write_accounts_file(accounts_file, accounts)
 
-        # 保存配置
-        with open(accounts_file, 'w') as f:
-            json.dump(accounts, f, indent=2, ensure_ascii=False)
+        # 记录写入后的文件状态，下一个账户保存时文件未被其他地方修改则直接复用
+        st = accounts_file.stat()
+        self._accounts_cache = ((st.st_mtime_ns, st.st_size), accounts)
 
         logger.info(f"✅ 配置已保存到 accounts.json: {email}")
         return config
     
-    def _register_one_sync(self) -> Dict[str, Any]:
+    def _register_one_sync(self, driver_pool: Optional[ReusableDriverPool] = None) -> Dict[str, Any]:
         """
         同步执行单次注册 (在线程池中运行)
+
+        Args:
+            driver_pool: 本批次的浏览器池，同一工作线程内复用浏览器，批量注册省去冷启动
         """
         try:
-            # 创建统一认证流程
-            auth_flow = GeminiAuthFlow(self.auth_config, self.auth_helper)
+            auth_flow = GeminiAuthFlow(self.auth_config, self.auth_helper, driver_pool=driver_pool)
 
             # 从配置读取重试次数
             from core.config import config
@@ -321,7 +337,8 @@ class RegisterService:
                 max_retries=max_retries,  # 验证码重试次数
                 retry_interval=retry_interval,  # 重试间隔
                 proxy_retry_enabled=proxy_retry_enabled,  # 代理错误重试开关
-                proxy_retry_count=proxy_retry_count  # 代理错误重试次数
+                proxy_retry_count=proxy_retry_count,  # 代理错误重试次数
+                stop_event=self._stop_event  # 停止信号（在各阶段之间检查）
             )
 
             if not result["success"]:
@@ -352,14 +369,22 @@ class RegisterService:
             count: 注册数量
             domain: 指定域名，为 None 则随机选择
         """
+        # _current_task_id 在批次的全部注册线程和清理结束后才清空，期间一律拒绝新批次
         if self._current_task_id:
-            current_task = self._tasks.get(self._current_task_id)
-            if current_task and current_task.status == RegisterStatus.RUNNING:
-                raise ValueError("已有注册任务在运行中")
+            raise ValueError("已有注册任务在运行中")
 
         # 设置指定的域名
         self._specified_domain = domain
 
+        # 上一批次剩余的预创建邮箱只在配置和指定域名都未变化时复用，否则丢弃
+        self._refresh_auth_objects()
+        queue_key = (self._auth_config_version, domain)
+        if queue_key != self._email_queue_key:
+            if self._email_queue:
+                logger.info(f"[REGISTER] 邮箱配置或域名已变化，丢弃 {len(self._email_queue)} 个预创建邮箱")
+            self._email_queue.clear()
+            self._email_queue_key = queue_key
+
         task = RegisterTask(
             id=str(uuid.uuid4()),
             count=count
@@ -375,40 +400,64 @@ class RegisterService:
     async def _run_register_async(self, task: RegisterTask):
         """异步执行注册任务"""
         task.status = RegisterStatus.RUNNING
-        loop = asyncio.get_event_loop()
-        
+        # 并发数在每个批次开始时读取，设置修改后下一批次生效
+        max_parallel = _register_max_parallel()
+        semaphore = asyncio.Semaphore(max_parallel)
+        # 注册线程要跑完整个浏览器流程，使用按批次创建的独立线程池，不占用默认线程池（文件读写、管理接口）
+        executor = ThreadPoolExecutor(
+            max_workers=max_parallel + _EMAIL_PREFETCH_CONCURRENCY,
+            thread_name_prefix="register",
+        )
+        loop = asyncio.get_running_loop()
+
+        # 邮箱预创建与注册同时进行（生产者/消费者），不阻塞第一个浏览器启动
+        prewarm_task = asyncio.create_task(self._prewarm_emails(task.count, executor))
+        # 浏览器池按批次创建，结束时只关闭本批次启动的浏览器
+        driver_pool = ReusableDriverPool()
+
+        async def run_one():
+            async with semaphore:
+                # 检查是否请求停止（已开始的注册会继续完成，未开始的不再启动）
+                # 任务保持 RUNNING，直到所有注册线程结束后再设置最终状态
+                if self._stop_event.is_set():
+                    if task.error is None:
+                        logger.warning(f"[REGISTER] 收到停止信号，中止注册任务")
+                        task.error = "用户中止"
+                    return
+                try:
+                    # 并发数由信号量限制，加上预创建的并发数不超过批次线程池大小
+                    result = await loop.run_in_executor(executor, self._register_one_sync, driver_pool)
+                except Exception as e:
+                    result = {"email": None, "success": False, "config": None, "error": str(e)}
+            # progress 表示已完成的注册数（并发执行，完成顺序不固定）
+            task.progress += 1
+            task.results.append(result)
+            if result["success"]:
+                task.success_count += 1
+            else:
+                task.fail_count += 1
+
         try:
-            for i in range(task.count):
-                # 检查是否请求停止
-                if self._stop_requested:
-                    logger.warning(f"[REGISTER] 收到停止信号，中止注册任务")
-                    task.status = RegisterStatus.FAILED
-                    task.error = "用户中止"
-                    break
-                
-                task.progress = i + 1
-                result = await loop.run_in_executor(self._executor, self._register_one_sync)
-                task.results.append(result)
-                
-                if result["success"]:
-                    task.success_count += 1
-                else:
-                    task.fail_count += 1
-                
-                # 每次注册间隔
-                if i < task.count - 1:
-                    await asyncio.sleep(random.randint(2, 5))
-            
-            # 只有未被中止才设置为成功/失败状态
-            if task.status == RegisterStatus.RUNNING:
-                task.status = RegisterStatus.SUCCESS if task.success_count > 0 else RegisterStatus.FAILED
+            # 注册流程主要在等待浏览器和网络，多个账户并发注册
+            await asyncio.gather(*(run_one() for _ in range(task.count)))
         except Exception as e:
-            task.status = RegisterStatus.FAILED
             task.error = str(e)
         finally:
+            # 等待预创建结束（已创建的邮箱留在队列中，配置和域名不变时供下一批次使用）
+            await prewarm_task
+            # 批量结束后关闭复用的浏览器，避免空闲时占用内存
+            await loop.run_in_executor(executor, driver_pool.quit_all)
+            executor.shutdown(wait=False)
+            # 清理全部完成后才设置最终状态：被中止或异常时为失败
+            if task.error is None and task.success_count > 0:
+                task.status = RegisterStatus.SUCCESS
+            else:
+                task.status = RegisterStatus.FAILED
             task.finished_at = time.time()
-            self._current_task_id = None
-            self._stop_requested = False  # 重置停止标志
+            # 只重置本批次持有的状态，避免影响已开始的下一批次
+            if self._current_task_id == task.id:
+                self._current_task_id = None
+                self._stop_event.clear()  # 重置停止标志
     
     def get_task(self, task_id: str) -> Optional[RegisterTask]:
         """获取任务状态"""
@@ -445,36 +494,41 @@ class RegisterService:
 
         try:
             while self._is_cron_polling:
-                enabled = config.auto_register.enabled
-                cron_expr = (config.auto_register.cron or "").strip()
+                # 规范化和解析结果缓存在配置对象上，配置未变化时不会重复解析
+                auto_register = config.auto_register
+                cron_expr = auto_register.normalized_cron
 
-                if not enabled or not cron_expr:
-                    await asyncio.sleep(30)
+                if not auto_register.enabled or not cron_expr:
+                    # 未启用时等待配置变更唤醒
+                    await self._wait_cron_wakeup(_CRON_MAX_SLEEP_SECONDS)
                     continue
 
-                if cron_expr != self._cron_cache_expr:
-                    try:
-                        self._cron_cache = _parse_cron_expression(cron_expr)
-                        self._cron_cache_expr = cron_expr
-                        logger.info(f"[REGISTER] 自动注册 Cron 已更新: {cron_expr}")
-                    except Exception as e:
-                        logger.error(f"[REGISTER] Cron 表达式错误: {e}")
-                        self._cron_cache = None
+                schedule = auto_register.compiled_cron
+                if schedule is None:
+                    if cron_expr != self._cron_cache_expr:
+                        logger.error(f"[REGISTER] Cron 表达式错误: {cron_expr}")
                         self._cron_cache_expr = cron_expr
-                        await asyncio.sleep(60)
-                        continue
-
-                if not self._cron_cache:
-                    await asyncio.sleep(60)
+                    await self._wait_cron_wakeup(_CRON_MAX_SLEEP_SECONDS)
                     continue
 
-                now = datetime.now()
-                run_key = now.strftime("%Y-%m-%d %H:%M")
-                if run_key != self._last_cron_run_key and _cron_matches(self._cron_cache, now):
+                if cron_expr != self._cron_cache_expr:
+                    self._cron_cache_expr = cron_expr
+                    logger.info(f"[REGISTER] 自动注册 Cron 已更新: {cron_expr}")
+
+                # 以整数分钟作为去重键，避免每次格式化时间字符串
+                now_ts = time.time()
+                now = datetime.fromtimestamp(now_ts)
+                run_key = int(now_ts) // 60
+                if run_key != self._last_cron_run_key and cron_matches(schedule, now):
                     self._last_cron_run_key = run_key
                     await self._start_auto_register()
 
-                await asyncio.sleep(20)
+                # 直接休眠到下一次触发时间（上限 _CRON_MAX_SLEEP_SECONDS，兼顾系统时间调整）
+                next_fire = next_cron_fire(schedule, now)
+                delay = _CRON_MAX_SLEEP_SECONDS
+                if next_fire is not None:
+                    delay = min(delay, max(1.0, (next_fire - datetime.now()).total_seconds()))
+                await self._wait_cron_wakeup(delay)
         except asyncio.CancelledError:
             logger.info("[REGISTER] 自动注册 Cron 轮询已停止")
         except Exception as e:
@@ -482,10 +536,22 @@ class RegisterService:
         finally:
             self._is_cron_polling = False
 
+    async def _wait_cron_wakeup(self, timeout: float):
+        """休眠 timeout 秒，配置变更或停止轮询时提前返回"""
+        try:
+            await asyncio.wait_for(self._cron_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._cron_wakeup.clear()
+
+    def notify_config_changed(self):
+        """配置热更新后唤醒 Cron 轮询，按新表达式重新计算下次触发时间"""
+        self._cron_wakeup.set()
+
     def stop_current_task(self):
         """停止当前注册任务"""
         if self._current_task_id:
-            self._stop_requested = True
+            self._stop_event.set()
             logger.info(f"[REGISTER] 请求停止当前注册任务: {self._current_task_id}")
             return True
         return False
@@ -493,8 +559,16 @@ class RegisterService:
     def stop_cron_polling(self):
         """停止自动注册 Cron 轮询"""
         self._is_cron_polling = False
+        self._cron_wakeup.set()
         logger.info("[REGISTER] 正在停止自动注册 Cron 轮询...")
 
+    def shutdown(self):
+        """关闭注册服务（停止轮询、关闭复用的浏览器）"""
+        self._stop_event.set()
+        self.stop_cron_polling()
+        quit_reusable_drivers()
+        self._http.close()
+
 
 # 全局注册服务实例
 _register_service: Optional[RegisterService] = None
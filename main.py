@@ -3,7 +3,6 @@ from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Union, Dict, Any
 from pathlib import Path
 import logging
-from dotenv import load_dotenv
 
 import httpx
 import aiofiles
@@ -13,6 +12,7 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from util.streaming_parser import parse_json_array_stream_async
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 
 # ---------- 数据目录配置 ----------
@@ -356,6 +356,11 @@ async def startup_event():
     """应用启动时初始化后台任务"""
     global global_stats
 
+    # 统一设置默认线程池大小（asyncio.to_thread 等共用，注册任务使用独立线程池），可通过 THREAD_POOL_SIZE 调整
+    thread_pool_size = max(1, int(os.getenv("THREAD_POOL_SIZE", "8")))
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=thread_pool_size))
+    logger.info(f"[SYSTEM] 默认线程池大小: {thread_pool_size}")
+
     # 文件迁移逻辑：将根目录的旧文件迁移到 data 目录
     old_accounts = "accounts.json"
     if os.path.exists(old_accounts) and not os.path.exists(ACCOUNTS_FILE):
@@ -371,7 +376,11 @@ async def startup_event():
 
     # 启动缓存清理任务
     asyncio.create_task(multi_account_mgr.start_background_cleanup())
-    logger.info("[SYSTEM] 后台缓存清理任务已启动（间隔: 5分钟）")
+    logger.info("[SYSTEM] 后台缓存清理任务已启动（间隔: 随缓存TTL自适应，最长5分钟）")
+
+    # 启动配置文件监听（外部修改 settings.yaml 后自动热更新）
+    asyncio.create_task(config_manager.watch(on_change=apply_runtime_config))
+    logger.info("[SYSTEM] 配置文件监听已启动")
 
     # 启动 Uptime 数据聚合任务
     asyncio.create_task(uptime_tracker.uptime_aggregation_task())
@@ -391,6 +400,15 @@ async def startup_event():
     else:
         logger.info("[SYSTEM] 登录服务未启用，跳过轮询任务")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时释放注册服务资源（复用的浏览器、线程池）"""
+    if _register_service_available:
+        try:
+            get_register_service().shutdown()
+        except Exception as e:
+            logger.warning(f"[SYSTEM] 关闭注册服务失败: {e}")
+
 # ---------- 日志脱敏函数 ----------
 def get_sanitized_logs(limit: int = 100) -> list:
     """获取脱敏后的日志列表，按请求ID分组并提取关键事件"""
@@ -777,7 +795,7 @@ async def admin_update_config(request: Request, accounts_data: list = Body(...))
     """更新整个账户配置"""
     global multi_account_mgr
     try:
-        multi_account_mgr = _update_accounts_config(
+        multi_account_mgr = await _update_accounts_config(
             accounts_data, multi_account_mgr, http_client, USER_AGENT,
             ACCOUNT_FAILURE_THRESHOLD, RATE_LIMIT_COOLDOWN_SECONDS,
             SESSION_CACHE_TTL_SECONDS, global_stats
@@ -793,7 +811,7 @@ async def admin_delete_account(request: Request, account_id: str):
     """删除单个账户"""
     global multi_account_mgr
     try:
-        multi_account_mgr = _delete_account(
+        multi_account_mgr = await _delete_account(
             account_id, multi_account_mgr, http_client, USER_AGENT,
             ACCOUNT_FAILURE_THRESHOLD, RATE_LIMIT_COOLDOWN_SECONDS,
             SESSION_CACHE_TTL_SECONDS, global_stats
@@ -809,7 +827,7 @@ async def admin_disable_account(request: Request, account_id: str):
     """手动禁用账户"""
     global multi_account_mgr
     try:
-        multi_account_mgr = _update_account_disabled_status(
+        multi_account_mgr = await _update_account_disabled_status(
             account_id, True, multi_account_mgr, http_client, USER_AGENT,
             ACCOUNT_FAILURE_THRESHOLD, RATE_LIMIT_COOLDOWN_SECONDS,
             SESSION_CACHE_TTL_SECONDS, global_stats
@@ -825,7 +843,7 @@ async def admin_enable_account(request: Request, account_id: str):
     """启用账户（同时重置错误禁用状态）"""
     global multi_account_mgr
     try:
-        multi_account_mgr = _update_account_disabled_status(
+        multi_account_mgr = await _update_account_disabled_status(
             account_id, False, multi_account_mgr, http_client, USER_AGENT,
             ACCOUNT_FAILURE_THRESHOLD, RATE_LIMIT_COOLDOWN_SECONDS,
             SESSION_CACHE_TTL_SECONDS, global_stats
@@ -865,7 +883,8 @@ async def admin_get_settings(request: Request):
             "mail_admin_key": config.basic.mail_admin_key,
             "google_mail": config.basic.google_mail,
             "email_domain": config.basic.email_domain,
-            "register_number": config.basic.register_number
+            "register_number": config.basic.register_number,
+            "register_concurrency": config.basic.register_concurrency
         },
         "image_generation": {
             "enabled": config.image_generation.enabled,
@@ -895,78 +914,95 @@ async def admin_get_settings(request: Request):
         }
     }
 
-@app.put("/admin/settings")
-@require_login()
-async def admin_update_settings(request: Request, new_settings: dict = Body(...)):
-    """更新系统设置"""
+# 已同步到运行时的配置版本（启动时读取的即为当前版本）
+_applied_config_version = config_manager.version
+
+
+async def apply_runtime_config():
+    """将 config_manager 中的最新配置同步到运行时（全局变量、HTTP 客户端、账户管理器）"""
     global API_KEY, PROXY, BASE_URL, LOGO_URL, CHAT_URL
     global IMAGE_GENERATION_ENABLED, IMAGE_GENERATION_MODELS
     global MAX_NEW_SESSION_TRIES, MAX_REQUEST_RETRIES, MAX_ACCOUNT_SWITCH_TRIES
     global ACCOUNT_FAILURE_THRESHOLD, RATE_LIMIT_COOLDOWN_SECONDS, SESSION_CACHE_TTL_SECONDS
     global SESSION_EXPIRE_HOURS, multi_account_mgr, http_client
+    global _applied_config_version
+
+    # 同一版本的配置只同步一次（管理面板保存与文件监听可能先后触发）
+    if config_manager.version == _applied_config_version:
+        return
+    _applied_config_version = config_manager.version
+
+    # 保存旧配置用于对比
+    old_proxy = PROXY
+    old_retry_config = {
+        "account_failure_threshold": ACCOUNT_FAILURE_THRESHOLD,
+        "rate_limit_cooldown_seconds": RATE_LIMIT_COOLDOWN_SECONDS,
+        "session_cache_ttl_seconds": SESSION_CACHE_TTL_SECONDS
+    }
 
-    try:
-        # 保存旧配置用于对比
-        old_proxy = PROXY
-        old_retry_config = {
-            "account_failure_threshold": ACCOUNT_FAILURE_THRESHOLD,
-            "rate_limit_cooldown_seconds": RATE_LIMIT_COOLDOWN_SECONDS,
-            "session_cache_ttl_seconds": SESSION_CACHE_TTL_SECONDS
-        }
+    # 更新全局变量（实时生效）
+    API_KEY = config.basic.api_key
+    PROXY = config.basic.proxy
+    BASE_URL = config.basic.base_url
+    LOGO_URL = config.public_display.logo_url
+    CHAT_URL = config.public_display.chat_url
+    IMAGE_GENERATION_ENABLED = config.image_generation.enabled
+    IMAGE_GENERATION_MODELS = config.image_generation.supported_models
+    MAX_NEW_SESSION_TRIES = config.retry.max_new_session_tries
+    MAX_REQUEST_RETRIES = config.retry.max_request_retries
+    MAX_ACCOUNT_SWITCH_TRIES = config.retry.max_account_switch_tries
+    ACCOUNT_FAILURE_THRESHOLD = config.retry.account_failure_threshold
+    RATE_LIMIT_COOLDOWN_SECONDS = config.retry.rate_limit_cooldown_seconds
+    SESSION_CACHE_TTL_SECONDS = config.retry.session_cache_ttl_seconds
+    SESSION_EXPIRE_HOURS = config.session.expire_hours
+
+    # 检查是否需要重建 HTTP 客户端（代理变化）
+    if old_proxy != PROXY:
+        logger.info(f"[CONFIG] 代理配置已变化，重建 HTTP 客户端")
+        await http_client.aclose()  # 关闭旧客户端
+        http_client = httpx.AsyncClient(
+            proxy=PROXY or None,
+            verify=False,
+            http2=False,
+            timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=60.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=100,
+                max_connections=200
+            )
+        )
+        # 更新所有账户的 http_client 引用
+        multi_account_mgr.update_http_client(http_client)
+
+    # 检查是否需要更新账户管理器配置（重试策略变化）
+    retry_changed = (
+        old_retry_config["account_failure_threshold"] != ACCOUNT_FAILURE_THRESHOLD or
+        old_retry_config["rate_limit_cooldown_seconds"] != RATE_LIMIT_COOLDOWN_SECONDS or
+        old_retry_config["session_cache_ttl_seconds"] != SESSION_CACHE_TTL_SECONDS
+    )
+
+    if retry_changed:
+        logger.info(f"[CONFIG] 重试策略已变化，更新账户管理器配置")
+        # 更新所有账户管理器的配置
+        multi_account_mgr.cache_ttl = SESSION_CACHE_TTL_SECONDS
+        for account_id, account_mgr in multi_account_mgr.accounts.items():
+            account_mgr.account_failure_threshold = ACCOUNT_FAILURE_THRESHOLD
+            account_mgr.rate_limit_cooldown_seconds = RATE_LIMIT_COOLDOWN_SECONDS
 
+    # 唤醒自动注册 Cron 轮询，按新配置重新计算下次触发时间
+    if _register_service_available:
+        get_register_service().notify_config_changed()
+
+@app.put("/admin/settings")
+@require_login()
+async def admin_update_settings(request: Request, new_settings: dict = Body(...)):
+    """更新系统设置"""
+    try:
         # 保存到 YAML
         config_manager.save_yaml(new_settings)
 
         # 热更新配置
         config_manager.reload()
-
-        # 更新全局变量（实时生效）
-        API_KEY = config.basic.api_key
-        PROXY = config.basic.proxy
-        BASE_URL = config.basic.base_url
-        LOGO_URL = config.public_display.logo_url
-        CHAT_URL = config.public_display.chat_url
-        IMAGE_GENERATION_ENABLED = config.image_generation.enabled
-        IMAGE_GENERATION_MODELS = config.image_generation.supported_models
-        MAX_NEW_SESSION_TRIES = config.retry.max_new_session_tries
-        MAX_REQUEST_RETRIES = config.retry.max_request_retries
-        MAX_ACCOUNT_SWITCH_TRIES = config.retry.max_account_switch_tries
-        ACCOUNT_FAILURE_THRESHOLD = config.retry.account_failure_threshold
-        RATE_LIMIT_COOLDOWN_SECONDS = config.retry.rate_limit_cooldown_seconds
-        SESSION_CACHE_TTL_SECONDS = config.retry.session_cache_ttl_seconds
-        SESSION_EXPIRE_HOURS = config.session.expire_hours
-
-        # 检查是否需要重建 HTTP 客户端（代理变化）
-        if old_proxy != PROXY:
-            logger.info(f"[CONFIG] 代理配置已变化，重建 HTTP 客户端")
-            await http_client.aclose()  # 关闭旧客户端
-            http_client = httpx.AsyncClient(
-                proxy=PROXY or None,
-                verify=False,
-                http2=False,
-                timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=60.0),
-                limits=httpx.Limits(
-                    max_keepalive_connections=100,
-                    max_connections=200
-                )
-            )
-            # 更新所有账户的 http_client 引用
-            multi_account_mgr.update_http_client(http_client)
-
-        # 检查是否需要更新账户管理器配置（重试策略变化）
-        retry_changed = (
-            old_retry_config["account_failure_threshold"] != ACCOUNT_FAILURE_THRESHOLD or
-            old_retry_config["rate_limit_cooldown_seconds"] != RATE_LIMIT_COOLDOWN_SECONDS or
-            old_retry_config["session_cache_ttl_seconds"] != SESSION_CACHE_TTL_SECONDS
-        )
-
-        if retry_changed:
-            logger.info(f"[CONFIG] 重试策略已变化，更新账户管理器配置")
-            # 更新所有账户管理器的配置
-            multi_account_mgr.cache_ttl = SESSION_CACHE_TTL_SECONDS
-            for account_id, account_mgr in multi_account_mgr.accounts.items():
-                account_mgr.account_failure_threshold = ACCOUNT_FAILURE_THRESHOLD
-                account_mgr.rate_limit_cooldown_seconds = RATE_LIMIT_COOLDOWN_SECONDS
+        await apply_runtime_config()
 
         logger.info(f"[CONFIG] 系统设置已更新并实时生效")
         return {"status": "success", "message": "设置已保存并实时生效！"}
@@ -1378,11 +1414,11 @@ async def chat_impl(
 
     # 3. 生成会话指纹，获取Session锁（防止同一对话的并发请求冲突）
     conv_key = get_conversation_key([m.model_dump() for m in req.messages], client_ip)
-    session_lock = await multi_account_mgr.acquire_session_lock(conv_key)
+    session_lock = multi_account_mgr.acquire_session_lock(conv_key)
 
     # 4. 在锁的保护下检查缓存和处理Session（保证同一对话的请求串行化）
     async with session_lock:
-        cached_session = multi_account_mgr.global_session_cache.get(conv_key)
+        cached_session = multi_account_mgr.get_session_cache(conv_key)
 
         if cached_session:
             # 使用已绑定的账户
@@ -1400,8 +1436,8 @@ async def chat_impl(
                 try:
                     account_manager = await multi_account_mgr.get_account(None, request_id)
                     google_session = await create_google_session(account_manager, http_client, USER_AGENT, request_id)
-                    # 线程安全地绑定账户到此对话
-                    await multi_account_mgr.set_session_cache(
+                    # 绑定账户到此对话
+                    multi_account_mgr.set_session_cache(
                         conv_key,
                         account_manager.config.account_id,
                         google_session
@@ -1456,8 +1492,8 @@ async def chat_impl(
         # 继续对话只发送当前消息
         text_to_send = last_text
         is_retry_mode = False
-        # 线程安全地更新时间戳
-        await multi_account_mgr.update_session_time(conv_key)
+        # 更新会话时间戳
+        multi_account_mgr.update_session_time(conv_key)
 
     chat_id = f"chatcmpl-{uuid.uuid4()}"
     created_time = int(time.time())
@@ -1482,11 +1518,11 @@ async def chat_impl(
         while retry_count <= max_retries:
             try:
                 # 安全：使用.get()防止缓存被清理导致KeyError
-                cached = multi_account_mgr.global_session_cache.get(conv_key)
+                cached = multi_account_mgr.get_session_cache(conv_key)
                 if not cached:
                     logger.warning(f"[CHAT] [{account_manager.config.account_id}] [req_{request_id}] 缓存已清理，重建Session")
                     new_sess = await create_google_session(account_manager, http_client, USER_AGENT, request_id)
-                    await multi_account_mgr.set_session_cache(
+                    multi_account_mgr.set_session_cache(
                         conv_key,
                         account_manager.config.account_id,
                         new_sess
@@ -1551,9 +1587,9 @@ async def chat_impl(
                 is_rate_limit = isinstance(e, HTTPException) and e.status_code == 429
 
                 # 增加账户失败计数（触发熔断机制）
-                account_manager.last_error_time = time.time()
+                account_manager.last_error_time = time.monotonic()
                 if is_rate_limit:
-                    account_manager.last_429_time = time.time()
+                    account_manager.last_429_time = time.monotonic()
 
                 account_manager.error_count += 1
                 if account_manager.error_count >= ACCOUNT_FAILURE_THRESHOLD:
@@ -1604,7 +1640,7 @@ async def chat_impl(
                         new_sess = await create_google_session(new_account, http_client, USER_AGENT, request_id)
 
                         # 更新缓存绑定到新账户
-                        await multi_account_mgr.set_session_cache(
+                        multi_account_mgr.set_session_cache(
                             conv_key,
                             new_account.config.account_id,
                             new_sess
@@ -1721,8 +1757,8 @@ async def stream_chat_generator(session: str, text_content: str, file_ids: List[
 
     # 解析模型特性
     model_features = parse_model_features(model_name)
-    base_model = model_features["base_model"]
-    use_anti_truncation = model_features["is_anti_truncation"]
+    base_model = model_features.base_model
+    use_anti_truncation = model_features.is_anti_truncation
 
     # 保存原始请求文本（用于续传）
     original_text = text_content
@@ -1886,7 +1922,7 @@ async def stream_chat_generator(session: str, text_content: str, file_ids: List[
 
         # 构建续传请求文本
         current_text = build_continuation_text(original_text, collected_content)
-        logger.debug(f"[ANTI-TRUNCATION] [{account_manager.config.account_id}] [req_{request_id}] 续传请求: {current_text[:200]}...")
+        logger.debug("[ANTI-TRUNCATION] [%s] [req_%s] 续传请求: %.200s...", account_manager.config.account_id, request_id, current_text)
 
         # 续传前需要刷新 JWT（可能已过期）
         jwt = await account_manager.get_jwt(request_id)
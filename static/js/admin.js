@@ -387,6 +387,7 @@ async function loadSettings() {
         document.getElementById('setting-google-mail').value = settings.basic?.google_mail || '';
         document.getElementById('setting-email-domain').value = settings.basic?.email_domain?.join(',') || '';
         document.getElementById('setting-register-number').value = settings.basic?.register_number || 5;
+        document.getElementById('setting-register-concurrency').value = settings.basic?.register_concurrency || 3;
 
         // 自动注册配置
         document.getElementById('setting-auto-register-enabled').checked = settings.auto_register?.enabled ?? false;
@@ -457,7 +458,8 @@ async function saveSettings() {
                 mail_admin_key: document.getElementById('setting-mail-admin-key').value,
                 google_mail: document.getElementById('setting-google-mail').value,
                 email_domain: document.getElementById('setting-email-domain').value.split(',').map(d => d.trim()).filter(d => d),
-                register_number: parseInt(document.getElementById('setting-register-number').value) || 5
+                register_number: parseInt(document.getElementById('setting-register-number').value) || 5,
+                register_concurrency: parseInt(document.getElementById('setting-register-concurrency').value) || 3
             },
             auto_register: {
                 enabled: document.getElementById('setting-auto-register-enabled').checked,
@@ -24,6 +24,9 @@ logger = logging.getLogger("gemini")
 DONE_MARKER = "[done]"
 MAX_CONTINUATION_ATTEMPTS = 3  # 最大续传尝试次数
 
+# 匹配 DONE_MARKER 及其前后空白（忽略大小写）
+_DONE_MARKER_RE = re.compile(r"\s*\[done\]\s*", re.IGNORECASE)
+
 # 注入到请求中的结束标记指令（放在用户消息末尾）
 ANTI_TRUNCATION_INSTRUCTION = f"""
 
@@ -56,11 +59,11 @@ def check_done_marker(text: str) -> bool:
 
 def remove_done_marker(text: str) -> str:
     """从文本中移除 DONE_MARKER（保留其他内容）"""
-    if not text:
+    # 流式 chunk 绝大多数不含标记，先用子串查找快速跳过正则
+    if not text or DONE_MARKER not in text.lower():
         return text
     # 使用正则匹配，处理可能的空白字符
-    pattern = re.compile(r"\s*\[done\]\s*", re.IGNORECASE)
-    return pattern.sub("", text)
+    return _DONE_MARKER_RE.sub("", text)
 
 
 def inject_anti_truncation_instruction(text_content: str) -> str:
@@ -0,0 +1,182 @@
+"""
+Cron 表达式工具
+
+支持标准 5 段 Cron（分 时 日 月 周），月份和星期可用英文缩写，
+星期中的 7 等同于 0（周日）。各字段解析为位掩码，解析结果缓存且只读。
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+_CRON_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+_CRON_DAYS = {
+    "sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6
+}
+# 字段名称表按键引用（dict 不可哈希，无法直接作为缓存参数）
+_CRON_NAMES: Dict[str, Dict[str, int]] = {
+    "months": _CRON_MONTHS,
+    "days": _CRON_DAYS,
+}
+
+
+def normalize_cron_expr(expr: str) -> str:
+    """规范化 Cron 表达式（去除首尾空白，字段间空白合并为单个空格）"""
+    return " ".join(expr.strip().split())
+
+
+def _parse_cron_value(value: str, names: Optional[Dict[str, int]] = None) -> int:
+    if names:
+        name_value = names.get(value.lower())
+        if name_value is not None:
+            return name_value
+    return int(value)
+
+
+@lru_cache(maxsize=512)
+def _parse_cron_field(
+    field: str,
+    min_value: int,
+    max_value: int,
+    names_key: Optional[str] = None,
+    allow_7_to_0: bool = False
+) -> int:
+    """
+    解析单个 Cron 字段，返回位掩码（第 k 位为 1 表示 k 在允许范围内）
+
+    结果按参数缓存：不同表达式中重复出现的 "*"、"0" 等字段只解析一次
+    names_key: 名称表键（"months" / "days"），None 表示不支持名称
+    """
+    names = _CRON_NAMES[names_key] if names_key else None
+    if field == "?":
+        field = "*"
+
+    mask = 0
+    parts = field.split(",")
+    for part in parts:
+        part = part.strip()
+        if not part:
+            raise ValueError("Cron 字段为空")
+
+        step = 1
+        base = part
+        if "/" in part:
+            base, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError("Cron 步长必须大于 0")
+
+        if base in ["*", "?"]:
+            start, end = min_value, max_value
+        elif "-" in base:
+            start_str, end_str = base.split("-", 1)
+            start = _parse_cron_value(start_str, names)
+            end = _parse_cron_value(end_str, names)
+        else:
+            start = end = _parse_cron_value(base, names)
+
+        if start > end:
+            raise ValueError("Cron 范围起止值错误")
+        if start < min_value or end > max_value:
+            raise ValueError("Cron 字段超出有效范围")
+
+        for val in range(start, end + 1, step):
+            mask |= 1 << val
+
+    if allow_7_to_0 and mask & (1 << 7):
+        mask = (mask & ~(1 << 7)) | 1
+
+    return mask
+
+
+@dataclass(frozen=True, slots=True)
+class CronSchedule:
+    """解析后的 Cron 计划（只读，可安全缓存共享；各字段为位掩码，第 k 位为 1 表示 k 匹配）"""
+    minute: int
+    hour: int
+    dom: int
+    month: int
+    dow: int
+    dom_any: bool
+    dow_any: bool
+
+
+def parse_cron_expression(expr: str) -> CronSchedule:
+    """解析 Cron 表达式，格式错误时抛出 ValueError"""
+    return _parse_normalized_cron_expression(normalize_cron_expr(expr))
+
+
+@lru_cache(maxsize=64)
+def _parse_normalized_cron_expression(normalized: str) -> CronSchedule:
+    """解析规范化后的 Cron 表达式（结果按表达式缓存）"""
+    parts = normalized.split(" ")
+    if len(parts) != 5:
+        raise ValueError("Cron 表达式需 5 段")
+
+    minute_field, hour_field, dom_field, month_field, dow_field = parts
+
+    return CronSchedule(
+        minute=_parse_cron_field(minute_field, 0, 59),
+        hour=_parse_cron_field(hour_field, 0, 23),
+        dom=_parse_cron_field(dom_field, 1, 31),
+        month=_parse_cron_field(month_field, 1, 12, names_key="months"),
+        dow=_parse_cron_field(dow_field, 0, 7, names_key="days", allow_7_to_0=True),
+        dom_any=dom_field == "*",
+        dow_any=dow_field == "*",
+    )
+
+
+def cron_matches(schedule: CronSchedule, now: datetime) -> bool:
+    """检查 now 所在分钟是否匹配 Cron 计划"""
+    # 各字段为位掩码，检查对应位是否为 1
+    if not (schedule.minute >> now.minute) & 1:
+        return False
+    if not (schedule.hour >> now.hour) & 1:
+        return False
+    if not (schedule.month >> now.month) & 1:
+        return False
+
+    return _cron_day_matches(schedule, now)
+
+
+def _cron_day_matches(schedule: CronSchedule, now: datetime) -> bool:
+    """检查日期（日 / 星期，按标准 Cron 语义组合）是否匹配"""
+    dom_match = (schedule.dom >> now.day) & 1
+    cron_dow = (now.weekday() + 1) % 7
+    dow_match = (schedule.dow >> cron_dow) & 1
+
+    if schedule.dom_any and schedule.dow_any:
+        return True
+    if schedule.dom_any:
+        return bool(dow_match)
+    if schedule.dow_any:
+        return bool(dom_match)
+    return bool(dom_match or dow_match)
+
+
+def next_cron_fire(schedule: CronSchedule, after: datetime) -> Optional[datetime]:
+    """
+    计算 after 所在分钟之后的下一次触发时间
+
+    月 / 日 / 小时不匹配时整段跳过，无需逐分钟遍历；一年内无匹配返回 None
+    """
+    t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = t + timedelta(days=366)
+    while t <= limit:
+        if not (schedule.month >> t.month) & 1:
+            # 跳到下个月 1 日 0 点
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        if not _cron_day_matches(schedule, t):
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if not (schedule.hour >> t.hour) & 1:
+            t = t.replace(minute=0) + timedelta(hours=1)
+            continue
+        if (schedule.minute >> t.minute) & 1:
+            return t
+        t += timedelta(minutes=1)
+    return None
@@ -0,0 +1,27 @@
+"""
+JSON 序列化工具
+
+优先使用 orjson（可选依赖，速度更快），未安装时回退到标准库 json。
+dumps_compact 输出无多余空白的紧凑格式，用于程序频繁读写的数据文件。
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+def loads(data):
+    """解析 JSON 字符串或字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_compact(obj) -> str:
+    """序列化为无多余空白的紧凑 JSON 字符串（保留非 ASCII 字符，两种实现输出一致）"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
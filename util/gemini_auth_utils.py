@@ -2,21 +2,24 @@
 Gemini Business 认证工具类
 抽取注册和登录服务的公共逻辑，遵循 DRY 原则
 """
+import atexit
 import json
 import os
 import re
 import shutil
 import subprocess
+import threading
 import time
+import weakref
 import logging
 import random
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 
 import requests
 import urllib3
-from selenium.webdriver import ActionChains
 
 from core.config import config
 
@@ -24,6 +27,151 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 logger = logging.getLogger("gemini.auth_utils")
 
+# undetected_chromedriver 启动时会修补并复用同一个 chromedriver 文件，多线程同时启动会冲突，需串行
+_CHROME_LAUNCH_LOCK = threading.Lock()
+
+
+# ==================== 浏览器复用 ====================
+
+# 单个浏览器最多复用的认证次数，超过后重启，避免内存持续增长
+DRIVER_MAX_USES = 20
+
+# Chrome 启动参数（常量，每次启动时依次添加）
+_CHROME_ARGS = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--window-size=1920,1080",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-gpu-compositing",
+    # ========== 反检测配置 ==========
+    # 禁用自动化控制标志
+    "--disable-blink-features=AutomationControlled",
+    # 禁用通知
+    "--disable-notifications",
+)
+
+# 复用浏览器前需要清理存储的站点（登录页、工作台及 Google 账户域）
+_REUSE_CLEAR_ORIGINS = (
+    "https://auth.business.gemini.google",
+    "https://business.gemini.google",
+    "https://accounts.google.com",
+    "https://www.google.com",
+)
+
+
+def _clear_driver_state(driver) -> None:
+    """清理上一个账户留下的 Cookie、缓存和各站点存储"""
+    # delete_all_cookies / localStorage.clear 只作用于当前域名，通过 CDP 清理所有域名
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    for origin in _REUSE_CLEAR_ORIGINS:
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+class ReusableDriverPool:
+    """
+    一批认证任务共享的浏览器池：每个工作线程持有一个可复用的浏览器
+
+    池按批次创建，quit_all 只关闭本批次启动的浏览器，不影响其他批次
+    """
+
+    def __init__(self):
+        # 当前线程的浏览器（driver / proxy / uses）
+        self._local = threading.local()
+        # 本池启动的所有浏览器，用于在任意线程统一关闭
+        self._drivers: set = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        with _driver_pools_lock:
+            _driver_pools.add(self)
+
+    def register(self, driver, proxy: Optional[str]) -> None:
+        """登记当前线程新启动的浏览器，供后续认证复用"""
+        with self._lock:
+            if self._closed:
+                # 池已关闭，浏览器由调用方在认证结束时关闭
+                return
+            self._drivers.add(driver)
+        self._local.driver = driver
+        self._local.proxy = proxy
+        self._local.uses = 1
+
+    def discard(self) -> None:
+        """关闭并丢弃当前线程的可复用浏览器"""
+        driver = getattr(self._local, "driver", None)
+        self._local.driver = None
+        if driver is None:
+            return
+        with self._lock:
+            self._drivers.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def owns(self, driver) -> bool:
+        """浏览器是否由本池管理（未登记的浏览器需调用方自行关闭）"""
+        with self._lock:
+            return driver in self._drivers
+
+    def take(self, proxy: Optional[str]):
+        """
+        取出当前线程可复用的浏览器，并清理上一个账户的会话状态
+
+        代理不一致（代理是启动参数）、超过复用次数或清理失败时关闭旧浏览器，返回 None
+        """
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            return None
+        if not self.owns(driver):
+            # 已被 quit_all 关闭
+            self._local.driver = None
+            return None
+        if self._local.proxy != proxy or self._local.uses >= DRIVER_MAX_USES:
+            self.discard()
+            return None
+        try:
+            _clear_driver_state(driver)
+        except Exception as e:
+            logger.warning(f"[AUTH] 复用浏览器清理失败，重新启动: {e}")
+            self.discard()
+            return None
+        self._local.uses += 1
+        return driver
+
+    def quit_all(self) -> None:
+        """关闭本池所有线程的浏览器（批量任务结束时调用）"""
+        with self._lock:
+            self._closed = True
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+# 所有存活的浏览器池，程序退出时统一关闭
+_driver_pools: "weakref.WeakSet[ReusableDriverPool]" = weakref.WeakSet()
+_driver_pools_lock = threading.Lock()
+
+
+def quit_reusable_drivers() -> None:
+    """关闭所有浏览器池中的可复用浏览器（程序退出时调用）"""
+    with _driver_pools_lock:
+        pools = list(_driver_pools)
+    for pool in pools:
+        pool.quit_all()
+
+
+atexit.register(quit_reusable_drivers)
+
 
 # ==================== 拟人化工具函数 ====================
 
@@ -84,6 +232,26 @@ def human_like_typing(element, text: str) -> None:
         time.sleep(base_delay)
 
 
+def human_like_word_typing(element, text: str) -> None:
+    """
+    按词输入文本（每个词一次 send_keys，词间模拟停顿）
+
+    适合姓名等只含字母和空格的短文本：比逐字符输入少很多 WebDriver 往返，
+    同时保留词间的自然停顿
+
+    Args:
+        element: Selenium WebElement
+        text: 要输入的文本
+    """
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        if i > 0:
+            word = " " + word
+        element.send_keys(word)
+        if i < len(words) - 1:
+            time.sleep(random.uniform(0.2, 0.5))
+
+
 def human_like_click(driver, element) -> None:
     """
     模拟真人的鼠标移动和点击（艹，直接点击太假了）
@@ -196,6 +364,7 @@ def human_like_email_check(driver, element, email: str) -> None:
 
     # 3. 模拟"失焦检查"（点击输入框外，触发校验，30% 概率）
     if random.random() < 0.3:
+        from selenium.webdriver.common.action_chains import ActionChains
         from selenium.webdriver.common.by import By
         try:
             # 点击页面空白区域
@@ -250,7 +419,9 @@ def human_like_scroll_into_view(driver, element) -> None:
         # 3. 滚动后的停顿（视觉定位时间）
         human_delay(0.3, 0.6, "滚动后定位元素")
 
+@lru_cache(maxsize=1)
 def get_chrome_path_and_major():
+    """定位 Chrome 并解析主版本号（结果缓存：进程内浏览器不会变化，避免每次认证都启动子进程探测）"""
     from selenium.webdriver.chrome.service import Service as ChromeService
     from selenium.webdriver.common.driver_finder import DriverFinder
     from selenium.webdriver.chrome.options import Options as SeleniumChromeOptions
@@ -832,7 +1003,23 @@ class GeminiAuthHelper:
         返回: {"success": bool, "config": dict|None, "error": str|None}
         """
         try:
-            time.sleep(3)  # 等待页面完全加载
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.common.exceptions import TimeoutException
+
+            def config_ready(d):
+                # 页面加载完成且提取所需的 Cookie 和 URL 参数都已就绪
+                return (
+                    d.execute_script("return document.readyState") == "complete"
+                    and "csesidx=" in d.current_url
+                    and d.get_cookie("__Secure-C_SES") is not None
+                    and d.get_cookie("__Host-C_OSES") is not None
+                )
+
+            try:
+                WebDriverWait(driver, 10, poll_frequency=0.2).until(config_ready)
+            except TimeoutException:
+                # 超时后按当前状态提取，缺失字段由下方完整性检查报告
+                pass
             cookies = driver.get_cookies()
             url = driver.current_url
             parsed = urlparse(url)
@@ -977,6 +1164,19 @@ class GeminiAuthHelper:
             return False
 
 
+def _stopped_result(email: Optional[str], used_proxy: Optional[str] = None) -> Dict[str, Any]:
+    """认证流程因停止信号中止时的返回结果"""
+    logger.info(f"🛑 认证流程已中止: {email}")
+    return {
+        "success": False,
+        "email": email,
+        "config": None,
+        "error": "用户中止",
+        "error_type": "stopped",
+        "used_proxy": used_proxy
+    }
+
+
 class GeminiAuthFlow:
     """
     统一的 Gemini 认证流程类
@@ -987,15 +1187,33 @@ class GeminiAuthFlow:
     - login: 登录模式（使用已有邮箱）
     """
 
+    # 姓名输入框选择器（注册用，合并为一个 CSS 选择器）
+    NAME_INPUT_SELECTOR = ", ".join([
+        "input[formcontrolname='fullName']",
+        "input[placeholder='全名']",
+        "input[placeholder='Full name']",
+        "input#mat-input-0",
+    ])
+
     # 姓名池（注册用）
     NAMES = [
         "James Smith", "John Johnson", "Robert Williams", "Michael Brown", "William Jones",
         "David Garcia", "Mary Miller", "Patricia Davis", "Jennifer Rodriguez", "Linda Martinez"
     ]
 
-    def __init__(self, auth_config: GeminiAuthConfig, auth_helper: GeminiAuthHelper):
+    def __init__(
+        self,
+        auth_config: GeminiAuthConfig,
+        auth_helper: GeminiAuthHelper,
+        driver_pool: Optional[ReusableDriverPool] = None,
+    ):
+        """
+        Args:
+            driver_pool: 浏览器池，传入时在同一工作线程内复用浏览器（批量注册用，省去每个账户的冷启动）
+        """
         self.config = auth_config
         self.helper = auth_helper
+        self.driver_pool = driver_pool
 
     def execute(
         self,
@@ -1005,7 +1223,8 @@ class GeminiAuthFlow:
         max_retries: int = 3,
         retry_interval: int = 5,
         proxy_retry_enabled: bool = False,
-        proxy_retry_count: int = 3
+        proxy_retry_count: int = 3,
+        stop_event: Optional[threading.Event] = None
     ) -> Dict[str, Any]:
         """
         执行统一认证流程
@@ -1018,6 +1237,7 @@ class GeminiAuthFlow:
             retry_interval: 重试间隔（秒）
             proxy_retry_enabled: 是否启用代理错误重试（从 proxy_health_check 配置读取）
             proxy_retry_count: 代理错误重试次数（从 proxy_check_retry_count 配置读取）
+            stop_event: 停止信号，设置后在下一个阶段之间中止（返回 error_type="stopped"）
 
         返回: {
             "success": bool,
@@ -1044,6 +1264,9 @@ class GeminiAuthFlow:
 
         # 重试逻辑
         for attempt in range(actual_max_retries):
+            if stop_event is not None and stop_event.is_set():
+                return _stopped_result(email)
+
             # 注册模式：每次重试创建新邮箱
             if mode == "register":
                 email = email_creator()
@@ -1053,11 +1276,11 @@ class GeminiAuthFlow:
             logger.info(f"🚀 [{mode.upper()}] 尝试 {attempt + 1}/{actual_max_retries}: {email}")
 
             # 执行单次认证（传入排除列表）
-            result = self._execute_once(mode, email, excluded_proxies=excluded_proxies)
+            result = self._execute_once(mode, email, excluded_proxies=excluded_proxies, stop_event=stop_event)
             last_result = result
 
-            # 成功则直接返回
-            if result["success"]:
+            # 成功或被中止则直接返回
+            if result["success"] or result.get("error_type") == "stopped":
                 return result
 
             # 检查错误类型
@@ -1084,7 +1307,12 @@ class GeminiAuthFlow:
 
             if can_retry:
                 logger.info(f"⏳ [{mode.upper()}] 等待 {retry_interval} 秒后重试...")
-                time.sleep(retry_interval)
+                if stop_event is not None:
+                    # 等待期间收到停止信号立即返回
+                    if stop_event.wait(retry_interval):
+                        return _stopped_result(email)
+                else:
+                    time.sleep(retry_interval)
                 continue
             elif error_type not in ["pin_input_not_found", "proxy_error"]:
                 # 其他错误不重试，直接返回
@@ -1100,7 +1328,13 @@ class GeminiAuthFlow:
             "last_error_type": last_result.get("error_type") if last_result else None
         }
 
-    def _execute_once(self, mode: str, email: str, excluded_proxies: set = None) -> Dict[str, Any]:
+    def _execute_once(
+        self,
+        mode: str,
+        email: str,
+        excluded_proxies: set = None,
+        stop_event: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
         """
         执行单次认证流程（不含重试）
 
@@ -1108,6 +1342,7 @@ class GeminiAuthFlow:
             mode: "register" 或 "login"
             email: 邮箱地址
             excluded_proxies: 需要排除的代理集合（会话级）
+            stop_event: 停止信号（在各阶段之间检查）
 
         返回: {
             "success": bool,
@@ -1122,6 +1357,7 @@ class GeminiAuthFlow:
             excluded_proxies = set()
 
         driver = None
+        keep_driver = False  # 成功且启用复用时保留浏览器给下一个账户
         selected_proxy = None  # 记录使用的代理
         proxy_pool = None  # 记录代理池实例
 
@@ -1131,6 +1367,7 @@ class GeminiAuthFlow:
             from selenium.webdriver.common.by import By
             from selenium.webdriver.support.ui import WebDriverWait
             from selenium.webdriver.common.keys import Keys
+            from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
             import os
             import random
         except ImportError as e:
@@ -1193,38 +1430,32 @@ class GeminiAuthFlow:
                     else:
                         logger.info(f"🌐 使用单个代理: {ProxyPool._mask_proxy(selected_proxy)}")
 
-            chrome_bin, major, out = get_chrome_path_and_major()
-
-            # 1. 配置并启动 Chrome
-            options = uc.ChromeOptions()
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--disable-software-rasterizer')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--disable-background-networking')
-            options.add_argument('--disable-default-apps')
-            options.add_argument('--disable-sync')
-            options.add_argument("--disable-features=VizDisplayCompositor")
-            options.add_argument("--disable-gpu-compositing")
-
-            # ========== 反检测配置 ==========
-            # 禁用自动化控制标志
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            # 禁用通知
-            options.add_argument('--disable-notifications')
-
-            # ========== 应用代理 ==========
-            if selected_proxy:
-                options.add_argument(f'--proxy-server={selected_proxy}')
-                logger.info(f"🌐 Chrome 启动使用代理: {ProxyPool._mask_proxy(selected_proxy)}")
-
-            driver = uc.Chrome(options=options, use_subprocess=True, version_main=major)
+            if stop_event is not None and stop_event.is_set():
+                return _stopped_result(email, selected_proxy)
+
+            # 1. 配置并启动 Chrome（复用浏览器时跳过）
+            if self.driver_pool is not None:
+                driver = self.driver_pool.take(selected_proxy)
+            if driver is None:
+                chrome_bin, major, out = get_chrome_path_and_major()
+                options = uc.ChromeOptions()
+                for arg in _CHROME_ARGS:
+                    options.add_argument(arg)
+
+                # ========== 应用代理 ==========
+                if selected_proxy:
+                    options.add_argument(f'--proxy-server={selected_proxy}')
+                    logger.info(f"🌐 Chrome 启动使用代理: {ProxyPool._mask_proxy(selected_proxy)}")
+
+                with _CHROME_LAUNCH_LOCK:
+                    driver = uc.Chrome(options=options, use_subprocess=True, version_main=major)
+                if self.driver_pool is not None:
+                    self.driver_pool.register(driver, selected_proxy)
             wait = WebDriverWait(driver, 30)
 
-            # 2. 访问登录页（加上随机延迟）
+            # 2. 访问登录页
+            # 无需固定等待，perform_email_verification 会等待邮箱输入框可点击
             driver.get(self.config.login_url)
-            human_delay(1.5, 2.5, "页面加载")
 
             # 3. 执行邮箱验证流程
             retry_config = app_config.retry
@@ -1250,35 +1481,33 @@ class GeminiAuthFlow:
                     "used_proxy": selected_proxy
                 }
 
+            if stop_event is not None and stop_event.is_set():
+                return _stopped_result(email, selected_proxy)
+
             # 4. 注册模式：输入姓名
             if mode == "register":
-                time.sleep(2)
-                selectors = [
-                    "input[formcontrolname='fullName']",
-                    "input[placeholder='全名']",
-                    "input[placeholder='Full name']",
-                    "input#mat-input-0",
-                ]
-                name_inp = None
-                for _ in range(30):
-                    for sel in selectors:
-                        try:
-                            name_inp = driver.find_element(By.CSS_SELECTOR, sel)
-                            if name_inp.is_displayed():
-                                break
-                        except:
-                            continue
-                    if name_inp and name_inp.is_displayed():
-                        break
-                    time.sleep(1)
+                # 显式等待姓名输入框出现，无需固定延迟
+                def find_visible_name_input(d):
+                    # 合并选择器，每轮只需一次 find_elements 往返
+                    for element in d.find_elements(By.CSS_SELECTOR, self.NAME_INPUT_SELECTOR):
+                        if element.is_displayed():
+                            return element
+                    return False
+
+                try:
+                    name_inp = WebDriverWait(
+                        driver, 30, ignored_exceptions=(StaleElementReferenceException,)
+                    ).until(find_visible_name_input)
+                except TimeoutException:
+                    name_inp = None
 
-                if name_inp and name_inp.is_displayed():
+                if name_inp:
                     name = random.choice(self.NAMES)
                     name_inp.click()
-                    human_like_typing(name_inp, name)
+                    human_like_word_typing(name_inp, name)
                     time.sleep(0.3)
                     name_inp.send_keys(Keys.ENTER)
-                    time.sleep(1)
+                    # 之后由 wait_for_workspace 等待跳转，无需固定延迟
                 else:
                     # 代理池：标记失败
                     if proxy_pool and selected_proxy:
@@ -1293,6 +1522,9 @@ class GeminiAuthFlow:
                         "used_proxy": selected_proxy
                     }
 
+            if stop_event is not None and stop_event.is_set():
+                return _stopped_result(email, selected_proxy)
+
             # 5. 等待进入工作台
             if not self.helper.wait_for_workspace(driver, timeout=60):
                 # 代理池：标记失败
@@ -1331,6 +1563,7 @@ class GeminiAuthFlow:
                 proxy_pool.mark_proxy_success(selected_proxy)
 
             logger.info(f"✅ [{mode.upper()}] 认证成功: {email}")
+            keep_driver = self.driver_pool is not None and self.driver_pool.owns(driver)
             return {
                 "success": True,
                 "email": email,
@@ -1362,11 +1595,15 @@ class GeminiAuthFlow:
                 "used_proxy": selected_proxy
             }
         finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+            if driver and not keep_driver:
+                if self.driver_pool is not None and self.driver_pool.owns(driver):
+                    # 失败后浏览器状态不可靠，不再复用
+                    self.driver_pool.discard()
+                else:
+                    try:
+                        driver.quit()
+                    except:
+                        pass
 
 
     def extract_config_with_retry(self, driver, max_retries: int = 3) -> Dict[str, Any]:
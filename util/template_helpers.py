@@ -146,7 +146,7 @@ def prepare_admin_template_data(
         "multi_account_mgr": multi_account_mgr,
         "static_version": static_version,
         # 模型列表（动态生成）
-        "available_models": ["gemini-auto"] + get_available_models(),
+        "available_models": ["gemini-auto", *get_available_models()],
         "base_models": ["gemini-auto"] + BASE_MODELS,  # 基础模型列表（用于图片生成配置）
         # 配置变量（用于 JavaScript）
         "main": {